@@ -2,6 +2,11 @@
 LangGraph flight agent for processing user messages and orchestrating flight search
 """
 
+import asyncio
+import hashlib
+import re
+import time
+from collections import OrderedDict
 from typing import Dict, Any, Tuple, Optional, TypedDict, List
 from datetime import datetime
 
@@ -26,6 +31,7 @@ class AgentStateDict(TypedDict):
     """TypedDict version of AgentState for LangGraph"""
     user_id: str
     user_message: str
+    stripped_user_message: str
     conversation_data: ConversationData
     reformulated_query: Optional[QueryReformulatorOutput]
     search_results: Optional[List[Itinerary]]
@@ -34,6 +40,8 @@ class AgentStateDict(TypedDict):
     should_search: bool
     needs_clarification: bool
     clarification_question: Optional[str]
+    current_search_hash: Optional[str]
+    speculative_iata: Optional[Dict[str, "asyncio.Task[List[str]]"]]
 from ..services.openai_io import OpenAIService
 from ..services.travelport import TravelportService
 from ..services.twilio_client import TwilioClient
@@ -42,14 +50,37 @@ from ..services.date_parse import DateParsingService
 from ..services.iata_resolver import IATAResolver
 from ..services.search_strategy import SearchStrategy
 from ..services.formatter import ItineraryFormatter
+from ..nlp.reformulator import QueryReformulator
 from ..integrations.dynamodb import DynamoDBRepository
 from .memory import ConversationMemory, ConversationSummarizer, ContextManager
-from .policies import TransitionConditions, NodeDecision
+from .policies import TransitionConditions, NodeDecision, AgentPolicies, SlotValidationPolicies
 from ..utils.logging import get_logger
 from ..utils.errors import TazaTicketError
 
 logger = get_logger(__name__)
 
+# Fallback responses for errors, keyed by language code
+_FALLBACK_RESPONSES: Dict[str, str] = {
+    "en": "I apologize, but I'm having technical difficulties. Please try again in a moment.",
+    "ur": "معذرت، مجھے تکنیکی مسائل کا سامنا ہے۔ کرپیا ایک لحظے میں دوبارہ کوشش کریں۔",
+    "es": "Me disculpo, pero estoy teniendo dificultades técnicas. Por favor, inténtalo de nuevo en un momento.",
+    "fr": "Je m'excuse, mais j'ai des difficultés techniques. Veuillez réessayer dans un moment.",
+    "de": "Entschuldigung, ich habe technische Schwierigkeiten. Bitte versuchen Sie es in einem Moment erneut.",
+    "ar": "أعتذر، لكنني أواجه صعوبات تقنية. يرجى المحاولة مرة أخرى بعد لحظة."
+}
+
+# Messages at least this long are re-checked for a language switch even when the language is known
+_LANGUAGE_REDETECT_LENGTH = 60
+
+# Languages written in Latin script; non-ASCII input while one of these is set suggests a switch
+_LATIN_SCRIPT_LANGUAGES = frozenset({"en", "es", "fr", "de"})
+
+# Cheap "from X to Y" capture used to start IATA resolution before the reformulator returns
+_ROUTE_PATTERN = re.compile(
+    r"\bfrom\s+([a-z][a-z .'-]{1,40}?)\s+to\s+([a-z][a-z .'-]{1,40}?)(?=\s+(?:on|in|for|next|this|tomorrow|today)\b|[,.?!]|$)",
+    re.IGNORECASE
+)
+
 
 class FlightAgentGraph:
     """LangGraph-based flight agent for processing user requests"""
@@ -66,7 +97,8 @@ class FlightAgentGraph:
         search_strategy: SearchStrategy,
         formatter: ItineraryFormatter,
         memory: Optional[ConversationMemory] = None,
-        summarizer: Optional[ConversationSummarizer] = None
+        summarizer: Optional[ConversationSummarizer] = None,
+        direct_dispatch: bool = True
     ):
         self.openai_service = openai_service
         self.dynamodb_service = dynamodb_service
@@ -83,11 +115,19 @@ class FlightAgentGraph:
         self.summarizer = summarizer if summarizer is not None else ConversationSummarizer(openai_service, max_messages=20)
         self.context_manager = ContextManager(self.memory, self.summarizer)
         
+        # Query reformulator is stateless per request, so build it once
+        self.reformulator = QueryReformulator(openai_service)
+        
         # Initialize transition policies
         self.transition_conditions = TransitionConditions()
         
-        # Build the LangGraph
+        # Node outputs reused under AgentPolicies.cache_policy_for, shared across users
+        self._node_cache: "OrderedDict[bytes, Tuple[Any, float]]" = OrderedDict()
+        self.node_cache_size = 2048
+        
+        # Build the LangGraph (still used when direct_dispatch is off, e.g. for tracing)
         self.graph = self._build_graph()
+        self.direct_dispatch = direct_dispatch
     
     def _build_graph(self) -> StateGraph:
         """Build the LangGraph state graph"""
@@ -98,8 +138,7 @@ class FlightAgentGraph:
         # Add nodes
         workflow.add_node("reformulate", self._reformulate_query_node)
         workflow.add_node("fill_slots", self._fill_slots_node)
-        workflow.add_node("plan_search", self._plan_search_node)
-        workflow.add_node("run_search", self._run_search_node)
+        workflow.add_node("plan_and_run_search", self._plan_and_run_search_node)
         workflow.add_node("summarize", self._summarize_results_node)
         workflow.add_node("respond", self._generate_response_node)
         workflow.add_node("clarify", self._generate_clarification_node)
@@ -107,37 +146,29 @@ class FlightAgentGraph:
         # Set entry point
         workflow.set_entry_point("reformulate")
         
-        # Add conditional edges based on policies
+        # Add conditional edges based on policies; search planning always follows slot filling
+        # and every non-clarify path ends in respond, so those steps need no predicate
         workflow.add_conditional_edges(
             "reformulate",
             self._decide_after_reformulate,
             {
                 NodeDecision.FILL_SLOTS: "fill_slots",
-                NodeDecision.PLAN_SEARCH: "plan_search"
+                NodeDecision.PLAN_SEARCH: "plan_and_run_search"
             }
         )
         
         workflow.add_conditional_edges(
             "fill_slots", 
             self._decide_after_fill_slots,
-            {NodeDecision.PLAN_SEARCH: "plan_search"}
-        )
-        
-        workflow.add_conditional_edges(
-            "plan_search",
-            self._decide_after_plan_search,
-            {
-                NodeDecision.RUN_SEARCH: "run_search",
-                NodeDecision.CLARIFY: "clarify",
-                NodeDecision.RESPOND: "respond"
-            }
+            {NodeDecision.PLAN_SEARCH: "plan_and_run_search"}
         )
         
         workflow.add_conditional_edges(
-            "run_search",
-            self._decide_after_search,
+            "plan_and_run_search",
+            self._decide_after_plan_and_run_search,
             {
                 NodeDecision.SUMMARIZE: "summarize",
+                NodeDecision.CLARIFY: "clarify",
                 NodeDecision.RESPOND: "respond"
             }
         )
@@ -154,42 +185,64 @@ class FlightAgentGraph:
         
         return workflow.compile()
     
+    @staticmethod
+    def _to_agent_state(state: AgentStateDict) -> AgentState:
+        """Wrap graph state as AgentState for policy decisions without re-validating it"""
+        # Values were produced by our own nodes, so skip Pydantic validation on every edge
+        return AgentState.model_construct(**state)
+    
     def _decide_after_reformulate(self, state: AgentStateDict) -> NodeDecision:
         """Decision function after reformulate node"""
-        # Convert dict to AgentState for policy decisions
-        agent_state = AgentState(**state)
+        agent_state = self._to_agent_state(state)
         decision = self.transition_conditions.next_node_after_reformulate(agent_state)
         self.transition_conditions.log_transition_decision("reformulate", decision, agent_state)
         return decision
     
     def _decide_after_fill_slots(self, state: AgentStateDict) -> NodeDecision:
         """Decision function after fill_slots node"""
-        agent_state = AgentState(**state)
+        agent_state = self._to_agent_state(state)
         decision = self.transition_conditions.next_node_after_fill_slots(agent_state)
         self.transition_conditions.log_transition_decision("fill_slots", decision, agent_state)
         return decision
     
-    def _decide_after_plan_search(self, state: AgentStateDict) -> NodeDecision:
-        """Decision function after plan_search node"""
-        agent_state = AgentState(**state)
-        decision = self.transition_conditions.next_node_after_plan_search(agent_state)
-        self.transition_conditions.log_transition_decision("plan_search", decision, agent_state)
-        return decision
-    
-    def _decide_after_search(self, state: AgentStateDict) -> NodeDecision:
-        """Decision function after run_search node"""
-        agent_state = AgentState(**state)
-        decision = self.transition_conditions.next_node_after_search(agent_state)
-        self.transition_conditions.log_transition_decision("run_search", decision, agent_state)
+    def _decide_after_plan_and_run_search(self, state: AgentStateDict) -> NodeDecision:
+        """Decision function after plan_and_run_search node"""
+        agent_state = self._to_agent_state(state)
+        decision = self.transition_conditions.next_node_after_plan_and_run_search(agent_state)
+        self.transition_conditions.log_transition_decision("plan_and_run_search", decision, agent_state)
         return decision
     
     def _decide_after_summarize(self, state: AgentStateDict) -> NodeDecision:
         """Decision function after summarize node"""
-        agent_state = AgentState(**state)
+        agent_state = self._to_agent_state(state)
         decision = self.transition_conditions.next_node_after_summarize(agent_state)
         self.transition_conditions.log_transition_decision("summarize", decision, agent_state)
         return decision
     
+    async def _run_nodes_direct(self, state: AgentStateDict) -> AgentStateDict:
+        """Walk the same node path as the compiled graph without LangGraph dispatch overhead"""
+        
+        state = dict(state)
+        
+        state.update(await self._reformulate_query_node(state))
+        if self._decide_after_reformulate(state) == NodeDecision.FILL_SLOTS:
+            state.update(await self._fill_slots_node(state))
+            self._decide_after_fill_slots(state)
+        
+        state.update(await self._plan_and_run_search_node(state))
+        decision = self._decide_after_plan_and_run_search(state)
+        
+        if decision == NodeDecision.CLARIFY:
+            state.update(await self._generate_clarification_node(state))
+            return state
+        
+        if decision == NodeDecision.SUMMARIZE:
+            state.update(await self._summarize_results_node(state))
+            self._decide_after_summarize(state)
+        
+        state.update(await self._generate_response_node(state))
+        return state
+    
     async def process_message(
         self,
         user_id: str,
@@ -212,32 +265,41 @@ class FlightAgentGraph:
         
         logger.info(f"Processing message for user {user_id}: {input_modality}")
         
+        # Background writes started mid-turn; always awaited so none are orphaned by a later failure
+        background_tasks: List[asyncio.Task] = []
         try:
-            # Load conversation data
-            conversation_data = await self.memory.get_or_create_conversation(user_id)
+            # Load conversation data; only pay for language detection when the language is unknown
+            # or the message may signal a switch, running it concurrently with the load
+            conv_task = asyncio.create_task(self.memory.get_or_create_conversation(user_id))
+            cached = self.memory.get_cached_conversation(user_id)
+            if cached is None or self._needs_language_detection(cached.language, user_message):
+                lang_task = asyncio.create_task(self.openai_service.detect_language(user_message))
+                conversation_data, detected_language = await asyncio.gather(conv_task, lang_task)
+            else:
+                conversation_data = await conv_task
+                detected_language = conversation_data.language
             
-            # Detect language if not already set
-            detected_language = await self.openai_service.detect_language(user_message)
             if detected_language:
                 if conversation_data.language and conversation_data.language != detected_language:
                     logger.info(f"Switching conversation language from {conversation_data.language} to {detected_language}")
                 conversation_data.language = detected_language
             
             # Add user message to conversation
-            user_msg = Message(
+            user_msg = Message.model_construct(
                 role="user",
                 content=user_message,
                 modality=input_modality,
                 language=detected_language,
                 media_url=media_url
             )
-            conversation_data.messages.append(user_msg)
+            self.memory.record_message(conversation_data, user_msg)
             conversation_data.last_modality = input_modality
             
             # Create agent state as TypedDict for LangGraph
             state: AgentStateDict = {
                 "user_id": user_id,
                 "user_message": user_message,
+                "stripped_user_message": user_message.strip(),
                 "conversation_data": conversation_data,
                 "reformulated_query": None,
                 "search_results": None,
@@ -245,11 +307,23 @@ class FlightAgentGraph:
                 "response_audio_url": None,
                 "should_search": False,
                 "needs_clarification": False,
-                "clarification_question": None
+                "clarification_question": None,
+                "current_search_hash": None,
+                "speculative_iata": None
             }
             
-            # Process through LangGraph
-            final_state = await self.graph.ainvoke(state)
+            # Process through the agent nodes
+            if self.direct_dispatch:
+                final_state = await self._run_nodes_direct(state)
+            else:
+                final_state = await self.graph.ainvoke(state)
+            self._cancel_speculation(final_state)
+            
+            # Persist the turn while TTS runs; it only needs the response text
+            persist_task = asyncio.create_task(
+                self._persist_turn(state["user_id"], state["user_message"], final_state.get("response_text", ""))
+            )
+            background_tasks.append(persist_task)
             
             # Generate audio if needed
             response_media_url = None
@@ -257,37 +331,36 @@ class FlightAgentGraph:
             
             if target_modality == MessageModality.VOICE and final_state.get("response_text"):
                 try:
-                    audio_data = await self.openai_service.text_to_speech(
+                    response_media_url = await self._synthesize_audio(
                         final_state["response_text"],
-                        voice="alloy"
-                    )
-                    response_media_url = await self.s3_service.upload_audio(
-                        audio_data,
                         user_id,
-                        content_type="audio/mpeg",
-                        file_extension="mp3"
+                        language=final_state["conversation_data"].language or "en"
                     )
                     final_state["response_audio_url"] = response_media_url
-                    logger.info("Generated TTS audio response")
                 except Exception as e:
                     logger.warning(f"TTS generation failed, falling back to text: {str(e)}")
                     target_modality = MessageModality.TEXT
             
             # Add assistant message to conversation
-            assistant_msg = Message(
+            assistant_msg = Message.model_construct(
                 role="assistant",
                 content=final_state.get("response_text", "Sorry, I encountered an issue processing your request."),
                 modality=target_modality,
                 language=conversation_data.language,
                 media_url=response_media_url
             )
-            final_state["conversation_data"].messages.append(assistant_msg)
+            self.memory.record_message(final_state["conversation_data"], assistant_msg)
             # Keep the cached ConversationData in sync for this user
             self.memory.set_conversation(final_state["conversation_data"])
+            # Durably store just this turn's two messages plus slot/state metadata
+            turn_task = asyncio.create_task(
+                self.memory.persist_turn(final_state["conversation_data"], [user_msg, assistant_msg])
+            )
+            background_tasks.append(turn_task)
             # Structured conversation logging (user input, assistant reply, recent history)
             try:
                 recent_history = []
-                for m in final_state["conversation_data"].messages[-10:]:
+                for m in self.memory.get_recent(user_id, 10):
                     recent_history.append({
                         "role": m.role,
                         "modality": m.modality.value if hasattr(m.modality, "value") else str(m.modality),
@@ -307,9 +380,7 @@ class FlightAgentGraph:
                 )
             except Exception:
                 pass
-            # Update in-memory context and flush to DynamoDB only when threshold is reached
-            await self.context_manager.update_context(state["user_id"], state["user_message"], final_state.get("response_text", ""))
-            await self.memory.flush_and_summarize_if_needed(state["user_id"], self.summarizer)
+            await asyncio.gather(persist_task, turn_task)
             
             logger.info(f"Agent processing completed: {target_modality}")
             
@@ -321,26 +392,120 @@ class FlightAgentGraph:
             # Generate fallback response
             fallback_message = self._get_fallback_response(detected_language if 'detected_language' in locals() else "en")
             return fallback_message, MessageModality.TEXT, None
+        
+        finally:
+            # Settle (and retrieve errors from) writes that an exception skipped past
+            for result in await asyncio.gather(*background_tasks, return_exceptions=True):
+                if isinstance(result, Exception):
+                    logger.warning(f"Background persistence failed for user {user_id}: {str(result)}")
+    
+    @staticmethod
+    def _needs_language_detection(language: Optional[str], user_message: str) -> bool:
+        """Decide whether a message warrants a language detection call"""
+        
+        if not language:
+            return True
+        if len(user_message) >= _LANGUAGE_REDETECT_LENGTH:
+            return True
+        return language in _LATIN_SCRIPT_LANGUAGES and not user_message.isascii()
+    
+    async def _synthesize_audio(self, text: str, user_id: str, language: str, voice: str = "alloy") -> str:
+        """Generate TTS audio and upload it, reusing the user's earlier uploads of identical responses"""
+        
+        # Scoped to the user: the uploaded object lives under their key prefix
+        cache_key = hashlib.blake2b(f"{user_id}|{text}|{voice}|{language}".encode(), digest_size=16).hexdigest()
+        cached_url = self.s3_service.get_cached_audio_url(cache_key)
+        if cached_url:
+            logger.info("Reusing cached TTS audio response")
+            return cached_url
+        
+        audio_data = await self.openai_service.text_to_speech(text, voice=voice)
+        media_url = await self.s3_service.upload_audio(
+            audio_data,
+            user_id,
+            content_type="audio/mpeg",
+            file_extension="mp3"
+        )
+        self.s3_service.cache_audio_url(cache_key, media_url)
+        logger.info("Generated TTS audio response")
+        return media_url
+    
+    async def _persist_turn(self, user_id: str, user_message: str, response_text: str) -> None:
+        """Update in-memory context and flush to DynamoDB only when threshold is reached"""
+        
+        if await self.context_manager.update_context(user_id, user_message, response_text):
+            await self.memory.flush_and_summarize_if_needed(user_id, self.summarizer)
+    
+    def _get_cached_node_output(self, key: bytes, ttl: float) -> Optional[Any]:
+        """Return a cached node output if present and younger than ttl"""
+        
+        entry = self._node_cache.get(key)
+        if entry is None:
+            return None
+        
+        value, stored_at = entry
+        if time.monotonic() - stored_at > ttl:
+            del self._node_cache[key]
+            return None
+        
+        self._node_cache.move_to_end(key)
+        return value
+    
+    def _cache_node_output(self, key: bytes, value: Any) -> None:
+        """Remember a node output, evicting the least recently used entries"""
+        
+        self._node_cache[key] = (value, time.monotonic())
+        self._node_cache.move_to_end(key)
+        while len(self._node_cache) > self.node_cache_size:
+            self._node_cache.popitem(last=False)
+    
+    def _start_speculative_resolution(self, user_message: str) -> Dict[str, "asyncio.Task[List[str]]"]:
+        """Begin resolving cities named in a "from X to Y" phrase while the reformulator runs"""
+        
+        match = _ROUTE_PATTERN.search(user_message)
+        if not match:
+            return {}
+        
+        speculative = {}
+        for city in match.groups():
+            key = city.lower().strip()
+            if key and key not in speculative:
+                speculative[key] = asyncio.create_task(self.iata_resolver.resolve_city_to_iata(key))
+        return speculative
+    
+    @staticmethod
+    def _cancel_speculation(state: Dict[str, Any]) -> None:
+        """Cancel speculative resolutions that no node consumed"""
+        
+        for task in (state.get("speculative_iata") or {}).values():
+            if not task.done():
+                task.cancel()
     
     async def _reformulate_query_node(self, state: AgentStateDict) -> Dict[str, Any]:
         """Reformulate user query to extract travel intent"""
         
         logger.info("Reformulating user query")
         
+        # Identical message, history and slots reformulate identically; skip the LLM call
+        cache_policy = AgentPolicies.cache_policy_for("reformulate")
+        cache_key = cache_policy.key_func(self._to_agent_state(state))
+        cached = self._get_cached_node_output(cache_key, cache_policy.ttl)
+        speculative = self._start_speculative_resolution(state["user_message"]) if cached is None else {}
+        
         try:
-            # Import here to avoid circular imports
-            from ..nlp.reformulator import QueryReformulator
-            
-            reformulator = QueryReformulator(self.openai_service)
-            
-            reformulator_input = QueryReformulatorInput(
-                user_message=state["user_message"],
-                conversation_history=state["conversation_data"].messages[-5:],  # Last 5 messages
-                current_slots=state["conversation_data"].slots
-            )
-            
-            # Use the enhanced reformulator with confidence scoring
-            reformulated, confidence = await reformulator.reformulate_with_confidence(reformulator_input)
+            if cached is not None:
+                # Deep copy: fill_slots assigns the IATA code lists straight into the user's slots
+                reformulated, confidence = cached[0].model_copy(deep=True), cached[1]
+            else:
+                reformulator_input = QueryReformulatorInput(
+                    user_message=state["user_message"],
+                    conversation_history=self.memory.get_recent(state["user_id"], 5),  # Last 5 messages
+                    current_slots=state["conversation_data"].slots
+                )
+                
+                # Use the enhanced reformulator with confidence scoring
+                reformulated, confidence = await self.reformulator.reformulate_with_confidence(reformulator_input)
+                self._cache_node_output(cache_key, (reformulated.model_copy(deep=True), confidence))
             
             logger.info(f"Query reformulated: {reformulated.intent} (confidence: {confidence:.2f})")
             
@@ -348,7 +513,8 @@ class FlightAgentGraph:
             
             # Return only the updated fields
             updates = {
-                "reformulated_query": reformulated
+                "reformulated_query": reformulated,
+                "speculative_iata": speculative
             }
             
             # If the reformulated query suggests clarification is needed, pass that along
@@ -360,8 +526,10 @@ class FlightAgentGraph:
             
         except Exception as e:
             logger.warning(f"Query reformulation failed: {str(e)}")
+            self._cancel_speculation({"speculative_iata": speculative})
             return {
-                "reformulated_query": None
+                "reformulated_query": None,
+                "speculative_iata": None
             }
     
     async def _fill_slots_node(self, state: AgentStateDict) -> Dict[str, Any]:
@@ -376,57 +544,47 @@ class FlightAgentGraph:
             query = state["reformulated_query"]
             
             # Update slots with new information
-            if query.from_city_name and query.from_city_name != current_slots.from_city:
+            from_changed = bool(query.from_city_name and query.from_city_name != current_slots.from_city)
+            to_changed = bool(query.to_city_name and query.to_city_name != current_slots.to_city)
+            date_text = query.date or query.date_range or query.month
+            
+            # Fan out IATA resolution and date parsing; parsing runs in a worker thread.
+            # Reuse speculative resolutions started before reformulation when the city matches.
+            speculative = state.get("speculative_iata") or {}
+            tasks = {}
+            if from_changed and not query.from_iata_codes:
+                tasks["from"] = speculative.pop(query.from_city_name.lower().strip(), None) or \
+                    asyncio.create_task(self.iata_resolver.resolve_city_to_iata(query.from_city_name))
+            if to_changed and not query.to_iata_codes:
+                tasks["to"] = speculative.pop(query.to_city_name.lower().strip(), None) or \
+                    asyncio.create_task(self.iata_resolver.resolve_city_to_iata(query.to_city_name))
+            self._cancel_speculation(state)
+            if date_text:
+                tasks["date"] = asyncio.create_task(asyncio.to_thread(self.date_service.parse_date, date_text))
+            results = dict(zip(tasks.keys(), await asyncio.gather(*tasks.values()))) if tasks else {}
+            
+            if from_changed:
                 current_slots.from_city = query.from_city_name
+                current_slots.from_iata_codes = results.get("from", query.from_iata_codes)
                 updated = True
                 
-                # Resolve IATA codes
-                if query.from_iata_codes:
-                    current_slots.from_iata_codes = query.from_iata_codes
-                else:
-                    iata_codes = await self.iata_resolver.resolve_city_to_iata(query.from_city_name)
-                    current_slots.from_iata_codes = iata_codes
-                
-            if query.to_city_name and query.to_city_name != current_slots.to_city:
+            if to_changed:
                 current_slots.to_city = query.to_city_name
+                current_slots.to_iata_codes = results.get("to", query.to_iata_codes)
                 updated = True
-                
-                # Resolve IATA codes
-                if query.to_iata_codes:
-                    current_slots.to_iata_codes = query.to_iata_codes
-                else:
-                    iata_codes = await self.iata_resolver.resolve_city_to_iata(query.to_city_name)
-                    current_slots.to_iata_codes = iata_codes
             
             # Handle date information
-            if query.date:
-                date_type, start_date, end_date = self.date_service.parse_date(query.date)
+            if date_text:
+                date_type, start_date, end_date = results["date"]
                 if date_type and start_date:
                     current_slots.date = start_date
                     current_slots.date_search_type = date_type
-                    if date_type in ["month", "range"]:
+                    # Exact dates only carry a range when the parser detected one
+                    if not query.date or date_type in ["month", "range"]:
                         current_slots.date_range_start = start_date
                         current_slots.date_range_end = end_date
                     updated = True
             
-            elif query.date_range:
-                date_type, start_date, end_date = self.date_service.parse_date(query.date_range)
-                if date_type and start_date:
-                    current_slots.date = start_date
-                    current_slots.date_search_type = date_type
-                    current_slots.date_range_start = start_date
-                    current_slots.date_range_end = end_date
-                    updated = True
-            
-            elif query.month:
-                date_type, start_date, end_date = self.date_service.parse_date(query.month)
-                if date_type and start_date:
-                    current_slots.date = start_date
-                    current_slots.date_search_type = date_type
-                    current_slots.date_range_start = start_date
-                    current_slots.date_range_end = end_date
-                    updated = True
-            
             if query.passengers and query.passengers != current_slots.passengers:
                 current_slots.passengers = query.passengers
                 updated = True
@@ -439,6 +597,8 @@ class FlightAgentGraph:
                 current_slots.preferred_carrier = query.preferred_carrier
                 updated = True
         
+        SlotValidationPolicies.apply_slot_defaults(current_slots)
+        
         # Update conversation state
         updates = {}
         if updated:
@@ -485,14 +645,27 @@ class FlightAgentGraph:
             if current_search_hash != state["conversation_data"].last_completed_search:
                 logger.info("Search needed - parameters changed")
                 return {
-                    "should_search": True
+                    "should_search": True,
+                    "current_search_hash": current_search_hash
                 }
             else:
                 logger.info("Using cached search results")
                 return {
-                    "should_search": False
+                    "should_search": False,
+                    "current_search_hash": current_search_hash
                 }
     
+    async def _plan_and_run_search_node(self, state: AgentStateDict) -> Dict[str, Any]:
+        """Plan the search and, when needed, run it in the same step"""
+        
+        updates = await self._plan_search_node(state)
+        if not updates.get("should_search"):
+            return updates
+        
+        # Run against a view carrying the plan's hash so it is not recomputed
+        updates.update(await self._run_search_node({**state, **updates}))
+        return updates
+    
     async def _run_search_node(self, state: AgentStateDict) -> Dict[str, Any]:
         """Execute flight search based on slots"""
         
@@ -521,12 +694,13 @@ class FlightAgentGraph:
                 itineraries = await self.search_strategy.search_exact_date(slots)
             
             # Limit results and sort by price
-            limited_itineraries = self.search_strategy.get_cheapest_itineraries(itineraries, limit=3)
+            limited_itineraries = await asyncio.to_thread(self.search_strategy.get_cheapest_itineraries, itineraries, limit=3)
             
             # Update conversation state
             conversation_data = state["conversation_data"]
             conversation_data.state = ConversationState.PRESENTING_RESULTS
-            search_hash = self.travelport_service.get_search_hash(slots)
+            # Reuse the hash computed while planning the search
+            search_hash = state.get("current_search_hash") or self.travelport_service.get_search_hash(slots)
             conversation_data.last_completed_search = search_hash
             
             logger.info(f"Search completed: {len(limited_itineraries)} results")
@@ -555,7 +729,7 @@ class FlightAgentGraph:
         # Use OpenAI to make it more natural and in the right language
         try:
             formatted_response = await self.openai_service.generate_response(
-                conversation_history=state["conversation_data"].messages,
+                conversation_history=self.memory.get_recent(state["user_id"], 3),
                 response_content=response_text,
                 target_language=state["conversation_data"].language or "en",
                 target_modality=state["conversation_data"].last_modality or MessageModality.TEXT
@@ -582,7 +756,8 @@ class FlightAgentGraph:
             
             if state.get("search_results"):
                 # Format search results
-                formatted_results = self.formatter.format_multiple_options(
+                formatted_results = await asyncio.to_thread(
+                    self.formatter.format_multiple_options,
                     state["search_results"],
                     modality=conversation_data.last_modality or MessageModality.TEXT,
                     max_options=3
@@ -607,7 +782,7 @@ class FlightAgentGraph:
             
             # Generate natural response using OpenAI
             final_response = await self.openai_service.generate_response(
-                conversation_history=conversation_data.messages,
+                conversation_history=self.memory.get_recent(conversation_data.user_id, 3),
                 response_content=formatted_results,
                 target_language=conversation_data.language or "en",
                 target_modality=conversation_data.last_modality or MessageModality.TEXT
@@ -633,20 +808,20 @@ class FlightAgentGraph:
         
         try:
             if state.get("search_results"):
-                # Get the best options
-                best_options = self.search_strategy.get_cheapest_itineraries(
+                # Get the best options (sorting/grouping runs off the event loop)
+                best_options = await asyncio.to_thread(
+                    self.search_strategy.get_cheapest_itineraries,
                     state["search_results"], 
                     limit=3
                 )
                 
                 # Group by date if we have date range results
                 if state["conversation_data"].slots.date_search_type in ["month", "range"]:
-                    date_groups = self.search_strategy.group_by_date(state["search_results"])
+                    date_mins = await asyncio.to_thread(self.search_strategy.min_price_by_date, state["search_results"])
                     
                     # Find the best date option
-                    if date_groups:
-                        best_date = min(date_groups.keys(), 
-                                      key=lambda date: min(it.price.total for it in date_groups[date]))
+                    if date_mins:
+                        best_date = min(date_mins, key=date_mins.get)
                         
                         # Highlight the best date in the results
                         for itinerary in best_options:
@@ -662,8 +837,14 @@ class FlightAgentGraph:
                 
                 # Add price range
                 if len(best_options) > 1:
-                    min_price = min(it.price.total for it in best_options)
-                    max_price = max(it.price.total for it in best_options)
+                    min_price = float("inf")
+                    max_price = float("-inf")
+                    for it in best_options:
+                        price = it.price.total
+                        if price < min_price:
+                            min_price = price
+                        if price > max_price:
+                            max_price = price
                     currency = best_options[0].price.currency
                     
                     if min_price != max_price:
@@ -690,13 +871,4 @@ class FlightAgentGraph:
     def _get_fallback_response(self, language: str) -> str:
         """Get fallback response for errors"""
         
-        fallback_responses = {
-            "en": "I apologize, but I'm having technical difficulties. Please try again in a moment.",
-            "ur": "معذرت، مجھے تکنیکی مسائل کا سامنا ہے۔ کرپیا ایک لحظے میں دوبارہ کوشش کریں۔",
-            "es": "Me disculpo, pero estoy teniendo dificultades técnicas. Por favor, inténtalo de nuevo en un momento.",
-            "fr": "Je m'excuse, mais j'ai des difficultés techniques. Veuillez réessayer dans un moment.",
-            "de": "Entschuldigung, ich habe technische Schwierigkeiten. Bitte versuchen Sie es in einem Moment erneut.",
-            "ar": "أعتذر، لكنني أواجه صعوبات تقنية. يرجى المحاولة مرة أخرى بعد لحظة."
-        }
-        
-        return fallback_responses.get(language, fallback_responses["en"]) 
\ No newline at end of file
+        return _FALLBACK_RESPONSES.get(language, _FALLBACK_RESPONSES["en"])
\ No newline at end of file
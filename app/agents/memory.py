@@ -2,16 +2,104 @@
 LangChain memory integration for conversation history management
 """
 
-from typing import List, Dict, Any, Optional
-from langchain.memory import ConversationBufferWindowMemory
-from langchain.schema import BaseMessage, HumanMessage, AIMessage
+import asyncio
+import hashlib
+import time
+import weakref
+from collections import deque, OrderedDict
+from dataclasses import dataclass, field
+from typing import List, Dict, Any, Optional, Deque, Tuple, NamedTuple, Sequence, Union, Callable, TYPE_CHECKING
+import redis.asyncio as aioredis
 
+from ..config import get_settings
 from ..models.schemas import Message, ConversationData, MessageModality
 from ..integrations.dynamodb import DynamoDBRepository
 from ..utils.logging import get_logger
 
+if TYPE_CHECKING:
+	from langchain.schema import BaseMessage
+
 logger = get_logger(__name__)
 
+# Number of formatted lines kept for get_conversation_context
+_CONTEXT_LINES = 6
+_NO_HISTORY = "No previous conversation"
+
+# LangChain message constructor per Message role; construct() skips validation since content is trusted str.
+# Built on first use so importing this module doesn't pull in LangChain.
+_ROLE_CTOR: Optional[Dict[str, Callable[..., "BaseMessage"]]] = None
+
+
+def _get_role_ctor() -> Dict[str, Callable[..., "BaseMessage"]]:
+	"""Import LangChain message types on first use and build the role dispatch table"""
+	global _ROLE_CTOR
+	if _ROLE_CTOR is None:
+		from langchain.schema import HumanMessage, AIMessage
+		_ROLE_CTOR = {"user": HumanMessage.construct, "assistant": AIMessage.construct}
+	return _ROLE_CTOR
+
+# Static part of the summarization prompt; the transcript and "Summary:" follow it
+_SUMMARY_PREAMBLE = """Please summarize this conversation between a user and a travel booking assistant. Focus on:
+1. Travel preferences and requirements mentioned
+2. Searches performed and results discussed
+3. Any booking decisions or preferences
+4. Important context for future interactions
+
+Conversation:
+"""
+
+
+class RingMessage(NamedTuple):
+	"""Lightweight (role, content) pair held by RingMemory"""
+	role: str
+	content: str
+
+
+class RingMemory:
+	"""Fixed-window chat log of (role, content) tuples, in place of ConversationBufferWindowMemory"""
+	
+	__slots__ = ("messages", "k")
+	
+	def __init__(self, k: int):
+		self.k = k
+		# Same window the LangChain buffer exposed: the last k exchanges
+		self.messages: Deque[RingMessage] = deque(maxlen=2 * k)
+	
+	def add_user(self, content: str) -> None:
+		"""Append a user message"""
+		self.messages.append(RingMessage("user", content))
+	
+	def add_ai(self, content: str) -> None:
+		"""Append an assistant message"""
+		self.messages.append(RingMessage("assistant", content))
+	
+	def history(self) -> List[RingMessage]:
+		"""Return the window oldest-first"""
+		return list(self.messages)
+	
+	def clear(self) -> None:
+		"""Drop all messages"""
+		self.messages.clear()
+	
+	def load_memory_variables(self, inputs: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+		"""Mirror LangChain's memory interface for downstream callers"""
+		return {"chat_history": self.history()}
+
+
+@dataclass(slots=True)
+class UserState:
+	"""Everything cached for one user, bundled so each access is a single lookup"""
+	# Full conversation object to avoid DB reads each request
+	conversation: Optional[ConversationData] = None
+	memory: Optional[RingMemory] = None
+	# Bounded tail of recent Message objects for prompt building
+	recent_messages: Optional[Deque[Message]] = None
+	# Pre-formatted "Human: ..." / "Assistant: ..." lines for prompt context
+	context_lines: Deque[str] = field(default_factory=lambda: deque(maxlen=_CONTEXT_LINES))
+	# How many messages since last persist/summary
+	pending_count: int = 0
+	last_access: float = field(default_factory=time.monotonic)
+
 
 class ConversationMemory:
 	"""LangChain memory wrapper for DynamoDB-backed conversation history"""
@@ -19,18 +107,91 @@ class ConversationMemory:
 	def __init__(self, dynamodb_repo: DynamoDBRepository, window_size: int = 10):
 		self.dynamodb_repo = dynamodb_repo
 		self.window_size = window_size
-		self._memory_cache: Dict[str, ConversationBufferWindowMemory] = {}
-		# Track how many messages since last persist/summary per user
-		self._pending_counts: Dict[str, int] = {}
-		# Cache full conversation objects to avoid DB reads each request
-		self._conversation_cache: Dict[str, ConversationData] = {}
+		# Per-user state in LRU order; idle and excess users are evicted to bound memory.
+		# Messages are persisted per turn, so eviction only costs a reload.
+		self._user_state: "OrderedDict[str, UserState]" = OrderedDict()
+		self.user_cache_size = 10_000
+		self.user_cache_ttl = 30 * 60
+		self.recent_messages_limit = 20
+		# Per-user locks, released for GC once no coroutine holds them
+		self._user_locks: "weakref.WeakValueDictionary[str, asyncio.Lock]" = weakref.WeakValueDictionary()
+		# Optional shared cache tier so a fresh instance can skip the DynamoDB read
+		settings = get_settings()
+		self._redis: Optional[aioredis.Redis] = aioredis.from_url(settings.redis_url) if settings.redis_url else None
+		self.redis_ttl = settings.redis_conversation_ttl
+		# Cold conversation reads arriving within a short window share one BatchGetItem
+		self._pending_reads: Dict[str, asyncio.Future] = {}
+		self._read_drain_task: Optional[asyncio.Task] = None
+		self.read_batch_window = 0.005
+		# Write-behind queue of (user_id, summary) pairs; a single worker persists them with retries
+		self._write_queue: "asyncio.Queue[Tuple[str, str]]" = asyncio.Queue()
+		self._write_worker: Optional[asyncio.Task] = None
+		self.write_max_attempts = 3
+	
+	def _peek_user_state(self, user_id: str) -> Optional[UserState]:
+		"""Return live cached state for a user, refreshing its LRU position, or None."""
+		user_state = self._user_state.get(user_id)
+		if user_state is None:
+			return None
+		now = time.monotonic()
+		if now - user_state.last_access > self.user_cache_ttl:
+			self._evict(user_id)
+			return None
+		user_state.last_access = now
+		self._user_state.move_to_end(user_id)
+		return user_state
+	
+	def _get_user_state(self, user_id: str) -> UserState:
+		"""Return cached state for a user, creating it and evicting idle/oldest users if needed."""
+		user_state = self._peek_user_state(user_id)
+		if user_state is not None:
+			return user_state
+		
+		# Oldest entries sit at the front, so stop at the first one still within its TTL
+		now = time.monotonic()
+		while self._user_state:
+			oldest_id = next(iter(self._user_state))
+			if now - self._user_state[oldest_id].last_access <= self.user_cache_ttl and len(self._user_state) < self.user_cache_size:
+				break
+			self._evict(oldest_id)
+		
+		user_state = UserState()
+		self._user_state[user_id] = user_state
+		return user_state
+	
+	def _user_lock(self, user_id: str) -> asyncio.Lock:
+		"""Return the lock guarding loads and flushes for a user."""
+		lock = self._user_locks.get(user_id)
+		if lock is None:
+			lock = asyncio.Lock()
+			self._user_locks[user_id] = lock
+		return lock
+	
+	def _evict(self, user_id: str) -> None:
+		"""Drop a user's cached state, releasing message references promptly."""
+		user_state = self._user_state.pop(user_id, None)
+		if user_state is not None and user_state.memory is not None:
+			user_state.memory.clear()
 	
 	async def get_or_create_conversation(self, user_id: str) -> ConversationData:
 		"""Return cached ConversationData or initialize from DB/empty."""
-		if user_id in self._conversation_cache:
-			return self._conversation_cache[user_id]
-		
-		conversation_data = await self.dynamodb_repo.get_conversation(user_id)
+		user_state = self._get_user_state(user_id)
+		if user_state.conversation is not None:
+			return user_state.conversation
+		
+		conversation_data = await self._load_shared_conversation(user_id)
+		if conversation_data is not None:
+			user_state.conversation = conversation_data
+			user_state.recent_messages = deque(conversation_data.messages[-self.recent_messages_limit:], maxlen=self.recent_messages_limit)
+			return conversation_data
+		
+		conversation_data, recent_messages = await asyncio.gather(
+			self._get_conversation_coalesced(user_id),
+			self.dynamodb_repo.get_recent_messages(user_id, limit=self.window_size),
+			return_exceptions=True
+		)
+		if isinstance(conversation_data, Exception):
+			raise conversation_data
 		if not conversation_data:
 			from ..models.schemas import Slots, ConversationState
 			conversation_data = ConversationData(
@@ -39,153 +200,348 @@ class ConversationMemory:
 				messages=[],
 				state=ConversationState.INITIAL
 			)
-		self._conversation_cache[user_id] = conversation_data
+		# Per-turn message items are newer than the snapshot's compacted message list
+		if isinstance(recent_messages, Exception):
+			logger.warning(f"Failed to load recent messages for {user_id}: {str(recent_messages)}")
+		elif recent_messages:
+			conversation_data.messages = recent_messages
+		user_state.conversation = conversation_data
+		user_state.recent_messages = deque(conversation_data.messages[-self.recent_messages_limit:], maxlen=self.recent_messages_limit)
+		await self._store_shared_conversation(conversation_data)
 		return conversation_data
 	
+	async def _get_conversation_coalesced(self, user_id: str) -> Optional[ConversationData]:
+		"""Queue a DynamoDB conversation read and wait for the batch it is dispatched in."""
+		future = self._pending_reads.get(user_id)
+		if future is None:
+			future = asyncio.get_running_loop().create_future()
+			self._pending_reads[user_id] = future
+			if self._read_drain_task is None or self._read_drain_task.done():
+				self._read_drain_task = asyncio.create_task(self._drain_pending_reads())
+		return await asyncio.shield(future)
+	
+	async def _drain_pending_reads(self) -> None:
+		"""Fetch queued conversations one BatchGetItem per coalescing window until no reads remain."""
+		# Reads queued while a batch is in flight are picked up by the next pass
+		while self._pending_reads:
+			await asyncio.sleep(self.read_batch_window)
+			pending, self._pending_reads = self._pending_reads, {}
+			try:
+				conversations = await self.dynamodb_repo.batch_get_conversations(list(pending))
+			except Exception as e:
+				for future in pending.values():
+					if not future.done():
+						future.set_exception(e)
+				continue
+			for user_id, future in pending.items():
+				if not future.done():
+					future.set_result(conversations.get(user_id))
+	
+	async def _load_shared_conversation(self, user_id: str) -> Optional[ConversationData]:
+		"""Read a conversation from the Redis tier, if configured."""
+		if self._redis is None:
+			return None
+		try:
+			raw = await self._redis.get(f"conv:{user_id}")
+			return ConversationData.model_validate_json(raw) if raw else None
+		except Exception as e:
+			logger.warning(f"Redis read failed for {user_id}: {str(e)}")
+			return None
+	
+	async def _store_shared_conversation(self, conversation_data: ConversationData) -> None:
+		"""Write a conversation through to the Redis tier, if configured."""
+		if self._redis is None:
+			return
+		try:
+			await self._redis.setex(f"conv:{conversation_data.user_id}", self.redis_ttl, conversation_data.model_dump_json())
+		except Exception as e:
+			logger.warning(f"Redis write failed for {conversation_data.user_id}: {str(e)}")
+	
+	def get_cached_conversation(self, user_id: str) -> Optional[ConversationData]:
+		"""Return the cached ConversationData without touching DynamoDB."""
+		user_state = self._peek_user_state(user_id)
+		return user_state.conversation if user_state is not None else None
+	
 	def set_conversation(self, conversation_data: ConversationData) -> None:
 		"""Update cached ConversationData for user."""
-		self._conversation_cache[conversation_data.user_id] = conversation_data
+		self._get_user_state(conversation_data.user_id).conversation = conversation_data
 	
-	async def get_memory(self, user_id: str) -> ConversationBufferWindowMemory:
-		"""Get or create LangChain memory for user"""
-		
-		if user_id not in self._memory_cache:
-			# Create new memory instance
-			memory = ConversationBufferWindowMemory(
-				k=self.window_size,
-				return_messages=True,
-				memory_key="chat_history"
+	def record_message(self, conversation_data: ConversationData, message: Message) -> None:
+		"""Append a message to the conversation and the recent-message window.
+		Full history lives in the DynamoDB messages table, so the in-memory list is trimmed
+		back to the window once it doubles (amortized O(1) per message)."""
+		messages = conversation_data.messages
+		messages.append(message)
+		if len(messages) > 2 * self.recent_messages_limit:
+			del messages[:-self.recent_messages_limit]
+		user_state = self._get_user_state(conversation_data.user_id)
+		if user_state.recent_messages is None:
+			user_state.recent_messages = deque(messages[-self.recent_messages_limit:], maxlen=self.recent_messages_limit)
+		else:
+			user_state.recent_messages.append(message)
+	
+	def get_recent(self, user_id: str, count: int) -> List[Message]:
+		"""Return up to `count` most recent messages without slicing the full history."""
+		user_state = self._peek_user_state(user_id)
+		if user_state is None:
+			return []
+		recent = user_state.recent_messages
+		if recent is None:
+			if user_state.conversation is None:
+				return []
+			recent = deque(user_state.conversation.messages[-self.recent_messages_limit:], maxlen=self.recent_messages_limit)
+			user_state.recent_messages = recent
+		if count >= len(recent):
+			return list(recent)
+		return [recent[i] for i in range(len(recent) - count, len(recent))]
+	
+	async def persist_turn(self, conversation_data: ConversationData, messages: List[Message]) -> None:
+		"""Write only this turn's messages and the small conversation metadata to DynamoDB."""
+		
+		fields = {
+			"slots": conversation_data.slots.dict(),
+			"state": conversation_data.state.value if hasattr(conversation_data.state, "value") else conversation_data.state,
+			"language": conversation_data.language,
+			"last_modality": conversation_data.last_modality.value if hasattr(conversation_data.last_modality, "value") else conversation_data.last_modality,
+			"last_completed_search": conversation_data.last_completed_search,
+			"last_itinerary_summary": conversation_data.last_itinerary_summary
+		}
+		try:
+			await asyncio.gather(
+				self.dynamodb_repo.put_messages(conversation_data.user_id, messages),
+				self.dynamodb_repo.update_conversation_fields(conversation_data.user_id, fields),
+				self._store_shared_conversation(conversation_data)
 			)
-			# Initialize counter
-			self._pending_counts[user_id] = 0
-			
-			# Prefer cached conversation to seed memory
-			conversation_data: Optional[ConversationData] = self._conversation_cache.get(user_id)
-			if conversation_data is None:
-				try:
-					conversation_data = await self.dynamodb_repo.get_conversation(user_id)
-				except Exception as e:
-					logger.warning(f"Failed to load conversation history for {user_id}: {str(e)}")
-			
-			if conversation_data and conversation_data.messages:
-				# If a summary exists, seed memory with it as an assistant message
-				if getattr(conversation_data, "conversation_summary", None):
-					memory.chat_memory.add_ai_message(f"[Summary] {conversation_data.conversation_summary}")
-				# Convert our messages to LangChain format (only recent window)
-				langchain_messages = self._convert_to_langchain_messages(
-					conversation_data.messages[-self.window_size:]
-				)
-				# Add messages to memory
-				for message in langchain_messages:
-					if isinstance(message, HumanMessage):
-						memory.chat_memory.add_user_message(message.content)
-					elif isinstance(message, AIMessage):
-						memory.chat_memory.add_ai_message(message.content)
-				logger.info(f"Loaded {len(langchain_messages)} messages into memory for user {user_id}")
+		except Exception as e:
+			logger.error(f"Failed to persist turn for user {conversation_data.user_id}: {str(e)}")
+	
+	def _get_cached_memory(self, user_id: str) -> Optional[RingMemory]:
+		"""Return already-loaded memory for user without an await."""
+		user_state = self._peek_user_state(user_id)
+		return user_state.memory if user_state is not None else None
+	
+	async def get_memory(self, user_id: str) -> RingMemory:
+		"""Get or create chat memory for user"""
+		
+		memory = self._get_cached_memory(user_id)
+		if memory is not None:
+			return memory
+		return await self._load_memory(user_id)
+	
+	async def _load_memory(self, user_id: str) -> RingMemory:
+		"""Create chat memory for user, seeded from the cached or stored conversation"""
+		
+		# Serialize first loads so concurrent requests for a user don't both hit DynamoDB
+		async with self._user_lock(user_id):
+			user_state = self._get_user_state(user_id)
+			if user_state.memory is None:
+				# Create new memory instance
+				memory = RingMemory(k=self.window_size)
+				# Initialize counter
+				user_state.pending_count = 0
+				
+				# Prefer cached conversation to seed memory
+				conversation_data: Optional[ConversationData] = user_state.conversation
+				if conversation_data is None:
+					try:
+						conversation_data = await self.dynamodb_repo.get_conversation(user_id)
+					except Exception as e:
+						logger.warning(f"Failed to load conversation history for {user_id}: {str(e)}")
+				
+				if conversation_data and conversation_data.messages:
+					# If a summary exists, seed memory with it as an assistant message
+					if getattr(conversation_data, "conversation_summary", None):
+						memory.add_ai(f"[Summary] {conversation_data.conversation_summary}")
+					# Add recent window of messages to memory
+					recent_window = conversation_data.messages[-self.window_size:]
+					for message in recent_window:
+						if message.role == "user":
+							memory.add_user(message.content)
+						elif message.role == "assistant":
+							memory.add_ai(message.content)
+					logger.info(f"Loaded {len(recent_window)} messages into memory for user {user_id}")
+				
+				# Seed the formatted context lines from whatever the memory now holds
+				user_state.context_lines.clear()
+				for message in list(memory.messages)[-_CONTEXT_LINES:]:
+					role = "Human" if message.role == "user" else "Assistant"
+					user_state.context_lines.append(f"{role}: {message.content}")
+				
+				user_state.memory = memory
 			
-			self._memory_cache[user_id] = memory
+			return user_state.memory
+	
+	def _convert_to_langchain_messages(self, messages: Sequence[Union[Message, RingMessage]]) -> List["BaseMessage"]:
+		"""Convert our Message objects (or ring entries) to LangChain format"""
 		
-		return self._memory_cache[user_id]
+		role_ctor = _get_role_ctor()
+		return [role_ctor[msg.role](content=msg.content) for msg in messages if msg.role in role_ctor]
 	
-	def _convert_to_langchain_messages(self, messages: List[Message]) -> List[BaseMessage]:
-		"""Convert our Message objects to LangChain format"""
+	async def add_user_message(self, user_id: str, message: str) -> bool:
+		"""Add user message to memory; returns True once a flush is due"""
 		
-		langchain_messages = []
+		memory = self._get_cached_memory(user_id) or await self._load_memory(user_id)
+		return self._append_user_message(user_id, memory, message)
+	
+	async def add_ai_message(self, user_id: str, message: str) -> bool:
+		"""Add AI message to memory; returns True once a flush is due"""
 		
-		for msg in messages:
-			if msg.role == "user":
-				langchain_messages.append(HumanMessage(content=msg.content))
-			elif msg.role == "assistant":
-				langchain_messages.append(AIMessage(content=msg.content))
+		memory = self._get_cached_memory(user_id) or await self._load_memory(user_id)
+		return self._append_ai_message(user_id, memory, message)
+	
+	async def add_exchange(self, user_id: str, user_message: str, ai_message: str) -> bool:
+		"""Add a user message and the AI reply with a single memory lookup; returns True once a flush is due"""
 		
-		return langchain_messages
+		memory = self._get_cached_memory(user_id) or await self._load_memory(user_id)
+		self._append_user_message(user_id, memory, user_message)
+		return self._append_ai_message(user_id, memory, ai_message)
 	
-	async def add_user_message(self, user_id: str, message: str) -> None:
-		"""Add user message to memory"""
+	def _append_user_message(self, user_id: str, memory: RingMemory, message: str) -> bool:
+		"""Record a user message in loaded memory and the context lines"""
 		
-		memory = await self.get_memory(user_id)
-		memory.chat_memory.add_user_message(message)
-		self._pending_counts[user_id] = self._pending_counts.get(user_id, 0) + 1
+		memory.add_user(message)
+		user_state = self._get_user_state(user_id)
+		user_state.context_lines.append(f"Human: {message}")
+		user_state.pending_count += 1
 		logger.debug(f"Added user message to memory for {user_id}")
+		return user_state.pending_count >= self.window_size
 	
-	async def add_ai_message(self, user_id: str, message: str) -> None:
-		"""Add AI message to memory"""
+	def _append_ai_message(self, user_id: str, memory: RingMemory, message: str) -> bool:
+		"""Record an AI message in loaded memory and the context lines"""
 		
-		memory = await self.get_memory(user_id)
-		memory.chat_memory.add_ai_message(message)
-		self._pending_counts[user_id] = self._pending_counts.get(user_id, 0) + 1
+		memory.add_ai(message)
+		user_state = self._get_user_state(user_id)
+		user_state.context_lines.append(f"Assistant: {message}")
+		user_state.pending_count += 1
 		logger.debug(f"Added AI message to memory for {user_id}")
+		return user_state.pending_count >= self.window_size
 	
 	async def flush_and_summarize_if_needed(self, user_id: str, summarizer: "ConversationSummarizer") -> Optional[str]:
 		"""If 10 messages accumulated in memory, summarize older context and persist to DynamoDB.
 		Returns summary text if created."""
 		
-		# Only flush when threshold met
-		if self._pending_counts.get(user_id, 0) < self.window_size:
-			return None
-		
-		# Reset counter first to avoid duplicate flushes on concurrent calls
-		self._pending_counts[user_id] = 0
-		
-		# Build Message list from memory to summarize
-		memory = await self.get_memory(user_id)
-		messages_texts: List[BaseMessage] = memory.chat_memory.messages
-		
-		# Convert LangChain messages back to our Message model
-		converted: List[Message] = []
-		for m in messages_texts:
-			if isinstance(m, HumanMessage):
-				converted.append(Message(role="user", content=m.content, modality=MessageModality.TEXT))
-			elif isinstance(m, AIMessage):
-				converted.append(Message(role="assistant", content=m.content, modality=MessageModality.TEXT))
-		
-		# Retrieve full conversation to keep slots/state, but we will not append every message
-		conversation_data = await self.dynamodb_repo.get_conversation(user_id)
-		if not conversation_data:
-			from ..models.schemas import Slots, ConversationState
-			conversation_data = ConversationData(user_id=user_id, slots=Slots(), messages=[], state=ConversationState.INITIAL)
-		
-		# Create/update summary from the converted memory messages
-		summary_text = await summarizer.summarize_conversation(converted)
-		if not summary_text:
-			return None
-		
-		conversation_data.conversation_summary = summary_text
-		# Reset stored messages to only keep the last small window for continuity
-		conversation_data.messages = converted[-4:]
-		
-		# Persist a compact record
-		await self.dynamodb_repo.save_conversation(conversation_data)
-		logger.info(f"Persisted summarized conversation for user {user_id}")
-		return summary_text
+		# Hold the user's lock so a concurrent flush waits and then sees the reset counter
+		async with self._user_lock(user_id):
+			# Only flush when threshold met
+			user_state = self._peek_user_state(user_id)
+			if user_state is None or user_state.memory is None or user_state.pending_count < self.window_size:
+				return None
+			
+			# Reset counter first to avoid duplicate flushes on concurrent calls
+			user_state.pending_count = 0
+			
+			# Build Message list from memory to summarize (already loaded; the lock is not re-entrant)
+			memory = user_state.memory
+			
+			# Convert ring entries back to our Message model (trusted data, skip validation)
+			converted: List[Message] = [
+				Message.model_construct(role=m.role, content=m.content, modality=MessageModality.TEXT)
+				for m in memory.messages
+			]
+			
+			# Reuse the cached conversation (slots/state) when present; otherwise read it from
+			# DynamoDB while the summary is generated, since the LLM call dominates
+			cached_conversation = user_state.conversation
+			if cached_conversation is not None:
+				summary_text = await summarizer.summarize_conversation(converted)
+				conversation_data = cached_conversation
+			else:
+				summary_text, conversation_data = await asyncio.gather(
+					summarizer.summarize_conversation(converted),
+					self.dynamodb_repo.get_conversation(user_id),
+					return_exceptions=True
+				)
+				if isinstance(summary_text, Exception):
+					raise summary_text
+			if not summary_text:
+				return None
+			if isinstance(conversation_data, Exception):
+				raise conversation_data
+			if not conversation_data:
+				from ..models.schemas import Slots, ConversationState
+				conversation_data = ConversationData(user_id=user_id, slots=Slots(), messages=[], state=ConversationState.INITIAL)
+			
+			conversation_data.conversation_summary = summary_text
+			self.set_conversation(conversation_data)
+			
+			# Persist only the summary: per-turn writes own slots/state on CURRENT, so a queued
+			# full snapshot could land after a later turn and roll them back
+			self._enqueue_write(user_id, summary_text)
+			logger.info(f"Queued conversation summary for user {user_id}")
+			return summary_text
+	
+	def _enqueue_write(self, user_id: str, summary_text: str) -> None:
+		"""Hand a summary to the background writer so the caller doesn't wait on DynamoDB."""
+		self._write_queue.put_nowait((user_id, summary_text))
+		if self._write_worker is None or self._write_worker.done():
+			self._write_worker = asyncio.create_task(self._drain_writes())
 	
-	async def get_chat_history(self, user_id: str) -> List[BaseMessage]:
+	async def _drain_writes(self) -> None:
+		"""Persist queued summaries one at a time, retrying with exponential backoff."""
+		while True:
+			user_id, summary_text = await self._write_queue.get()
+			try:
+				for attempt in range(self.write_max_attempts):
+					try:
+						await self.dynamodb_repo.update_conversation_fields(user_id, {"conversation_summary": summary_text})
+						logger.info(f"Persisted conversation summary for user {user_id}")
+						break
+					except Exception as e:
+						if attempt == self.write_max_attempts - 1:
+							logger.error(f"Giving up persisting conversation summary for user {user_id}: {str(e)}")
+						else:
+							await asyncio.sleep(0.5 * (2 ** attempt))
+			finally:
+				self._write_queue.task_done()
+	
+	async def drain_pending_writes(self) -> None:
+		"""Wait for queued snapshot writes to finish (call on shutdown)."""
+		await self._write_queue.join()
+		if self._write_worker is not None:
+			self._write_worker.cancel()
+	
+	async def get_chat_history(self, user_id: str) -> List["BaseMessage"]:
 		"""Get chat history as LangChain messages"""
 		
 		memory = await self.get_memory(user_id)
-		return memory.chat_memory.messages
+		return self._convert_to_langchain_messages(memory.history())
 	
 	async def get_conversation_context(self, user_id: str) -> str:
 		"""Get conversation context as formatted string"""
 		
-		messages = await self.get_chat_history(user_id)
+		# Answer from cached state when it already tells us whether there is history
+		user_state = self._peek_user_state(user_id)
+		if user_state is not None:
+			if user_state.context_lines:
+				return "\n".join(user_state.context_lines)
+			if self._known_empty(user_state):
+				return _NO_HISTORY
 		
-		if not messages:
-			return "No previous conversation"
+		# Otherwise load memory (and its formatted lines) for this user
+		await self.get_memory(user_id)
+		context_lines = self._get_user_state(user_id).context_lines
 		
-		context_lines = []
-		for msg in messages[-6:]:  # Last 6 messages for context
-			role = "Human" if isinstance(msg, HumanMessage) else "Assistant"
-			context_lines.append(f"{role}: {msg.content}")
+		if not context_lines:
+			return _NO_HISTORY
 		
 		return "\n".join(context_lines)
 	
+	@staticmethod
+	def _known_empty(user_state: UserState) -> bool:
+		"""True when cached state shows the user has no history, so loading memory would find nothing"""
+		if user_state.memory is not None:
+			return True
+		conversation = user_state.conversation
+		return conversation is not None and not conversation.messages and not conversation.conversation_summary
+	
 	async def clear_memory(self, user_id: str) -> None:
 		"""Clear memory for user"""
 		
-		if user_id in self._memory_cache:
-			self._memory_cache[user_id].clear()
-			del self._memory_cache[user_id]
+		user_state = self._peek_user_state(user_id)
+		if user_state is not None and user_state.memory is not None:
+			user_state.memory.clear()
+			user_state.memory = None
+			user_state.context_lines.clear()
 			logger.info(f"Cleared memory for user {user_id}")
 	
 	async def get_memory_variables(self, user_id: str) -> Dict[str, Any]:
@@ -197,12 +553,13 @@ class ConversationMemory:
 	def get_memory_stats(self, user_id: str) -> Dict[str, Any]:
 		"""Get memory statistics"""
 		
-		if user_id not in self._memory_cache:
+		user_state = self._peek_user_state(user_id)
+		if user_state is None or user_state.memory is None:
 			return {"message_count": 0, "memory_loaded": False}
 		
-		memory = self._memory_cache[user_id]
+		memory = user_state.memory
 		return {
-			"message_count": len(memory.chat_memory.messages),
+			"message_count": len(memory.messages),
 			"memory_loaded": True,
 			"window_size": self.window_size
 		}
@@ -214,6 +571,9 @@ class ConversationSummarizer:
 	def __init__(self, openai_service, max_messages: int = 20):
 		self.openai_service = openai_service
 		self.max_messages = max_messages
+		# LRU of summaries keyed by a hash of the summarized text
+		self._summary_cache: "OrderedDict[str, str]" = OrderedDict()
+		self.summary_cache_size = 2048
 	
 	async def should_summarize(self, messages: List[Message]) -> bool:
 		"""Determine if conversation should be summarized"""
@@ -228,24 +588,20 @@ class ConversationSummarizer:
 		# Take messages excluding the last 4 (keep recent context)
 		messages_to_summarize = messages[:-4]
 		
-		conversation_text = []
-		for msg in messages_to_summarize:
-			role = "User" if msg.role == "user" else "Assistant"
-			conversation_text.append(f"{role}: {msg.content}")
+		conversation_str = "\n".join([
+			f"{'User' if msg.role == 'user' else 'Assistant'}: {msg.content}"
+			for msg in messages_to_summarize
+		])
 		
-		conversation_str = "\n".join(conversation_text)
+		cache_key = hashlib.blake2b(conversation_str.encode(), digest_size=16).hexdigest()
+		cached_summary = self._summary_cache.get(cache_key)
+		if cached_summary is not None:
+			self._summary_cache.move_to_end(cache_key)
+			logger.info("Reusing cached conversation summary")
+			return cached_summary
 		
 		try:
-			summary_prompt = f"""Please summarize this conversation between a user and a travel booking assistant. Focus on:
-1. Travel preferences and requirements mentioned
-2. Searches performed and results discussed
-3. Any booking decisions or preferences
-4. Important context for future interactions
-
-Conversation:
-{conversation_str}
-
-Summary:"""
+			summary_prompt = _SUMMARY_PREAMBLE + conversation_str + "\n\nSummary:"
 			
 			summary = await self.openai_service.chat_completion(
 				messages=[{"role": "user", "content": summary_prompt}],
@@ -254,6 +610,10 @@ Summary:"""
 				max_tokens=200
 			)
 			
+			self._summary_cache[cache_key] = summary
+			if len(self._summary_cache) > self.summary_cache_size:
+				self._summary_cache.popitem(last=False)
+			
 			logger.info("Generated conversation summary")
 			return summary
 			
@@ -319,15 +679,15 @@ class ContextManager:
 				"summary": ""
 			}
 	
-	async def update_context(self, user_id: str, user_message: str, ai_response: str) -> None:
-		"""Update conversation context with new messages"""
+	async def update_context(self, user_id: str, user_message: str, ai_response: str) -> bool:
+		"""Update conversation context with new messages; returns True when a flush is due"""
 		
 		try:
-			await self.memory.add_user_message(user_id, user_message)
-			await self.memory.add_ai_message(user_id, ai_response)
+			return await self.memory.add_exchange(user_id, user_message, ai_response)
 			
 		except Exception as e:
 			logger.error(f"Failed to update context for user {user_id}: {str(e)}")
+			return False
 	
 	async def reset_context(self, user_id: str) -> None:
 		"""Reset conversation context for user"""
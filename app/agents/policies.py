@@ -2,8 +2,15 @@
 LangGraph transition conditions and policies for agent state management
 """
 
-from typing import Dict, Any, List, Optional
-from enum import Enum
+import hashlib
+import itertools
+import logging
+import re
+from datetime import date
+from functools import cache, lru_cache
+from typing import Dict, Any, List, Optional, Callable, Iterator, Mapping, NamedTuple, Tuple
+from enum import IntEnum
+from types import MappingProxyType
 
 from ..models.schemas import (
     AgentState, 
@@ -12,33 +19,160 @@ from ..models.schemas import (
     TripType,
     QueryReformulatorOutput
 )
+from ..services.travelport import TravelportService
 from ..utils.logging import get_logger
 
 logger = get_logger(__name__)
 
+# Conversation states in which we are still clarifying or collecting information
+_ACTIVE_STATES: frozenset = frozenset({
+    ConversationState.INITIAL,
+    ConversationState.COLLECTING_SLOTS,
+    ConversationState.CLARIFYING
+})
 
-class NodeDecision(str, Enum):
-    """Possible node decisions for graph transitions"""
+# Three uppercase letters, matched in C instead of a Python-level length loop
+_IATA_RE = re.compile(r"[A-Z]{3}").fullmatch
+
+# Main airports for major cities, searched first in multi-airport searches
+_MAJOR_AIRPORTS: frozenset = frozenset({
+    "LHR", "JFK", "CDG", "DXB", "SIN", "NRT", "HND",
+    "FRA", "AMS", "MAD", "BCN", "FCO", "MXP"
+})
+
+
+class NodeDecision(IntEnum):
+    """Possible node decisions for graph transitions (ints compare and hash cheaply on every edge)"""
     
     # Flow control
-    CONTINUE = "continue"
-    SKIP = "skip"
-    RETRY = "retry"
-    END = "end"
+    CONTINUE = 0
+    SKIP = 1
+    RETRY = 2
+    END = 3
     
     # Specific transitions
-    REFORMULATE = "reformulate"
-    FILL_SLOTS = "fill_slots"
-    PLAN_SEARCH = "plan_search"
-    RUN_SEARCH = "run_search"
-    SUMMARIZE = "summarize"
-    RESPOND = "respond"
-    CLARIFY = "clarify"
+    REFORMULATE = 4
+    FILL_SLOTS = 5
+    PLAN_SEARCH = 6
+    SUMMARIZE = 8
+    RESPOND = 9
+    CLARIFY = 10
+    
+    @property
+    def label(self) -> str:
+        """String name used in logs, e.g. fill_slots"""
+        return _NODE_LABELS[self]
+
+
+# Former string values of NodeDecision, kept for logging
+_NODE_LABELS: Mapping[NodeDecision, str] = MappingProxyType({decision: decision.name.lower() for decision in NodeDecision})
+
+
+# Human-readable reasons logged with each graph transition
+_TRANSITION_REASONS: Mapping[NodeDecision, str] = MappingProxyType({
+    NodeDecision.FILL_SLOTS: "Need to extract travel information from user message",
+    NodeDecision.PLAN_SEARCH: "Ready to plan flight search strategy",
+    NodeDecision.CLARIFY: "Missing required information, need user clarification",
+    NodeDecision.SUMMARIZE: "Multiple results found, preparing summary",
+    NodeDecision.RESPOND: "Ready to generate final response",
+    NodeDecision.END: "Conversation completed"
+})
+
+
+class NodeCachePolicy(NamedTuple):
+    """How long a node's output may be reused and which state it is keyed on"""
+    
+    ttl: float
+    key_func: Callable[[AgentState], bytes]
+
+
+def _reformulate_cache_key(state: AgentState) -> bytes:
+    """Key reformulation on everything the reformulator sees: message, recent history, slots and today's date"""
+    
+    # Relative dates ("tomorrow") resolve against today, so entries must not outlive the day
+    history = "|".join(f"{m.role}:{m.content}" for m in state.conversation_data.messages[-5:])
+    raw = f"{date.today().isoformat()}|{state.user_message}|{history}|{state.conversation_data.slots.json()}"
+    return hashlib.blake2b(raw.encode(), digest_size=16).digest()
+
+
+@lru_cache(maxsize=512)
+def _is_iso_date(date_str: Optional[str]) -> bool:
+    """Parse-validate a YYYY-MM-DD string; slot dates repeat across turns, so results are memoized"""
+    
+    # fromisoformat also accepts compact and week dates (20250101, 2025-W01-1), so pin the layout first
+    if not isinstance(date_str, str) or len(date_str) != 10 or date_str[4] != '-' or date_str[7] != '-':
+        return False
+    try:
+        date.fromisoformat(date_str)
+        return True
+    except ValueError:
+        return False
+
+
+# (predicate, label) pairs for required slots, in the order they are reported
+_REQUIRED_SLOT_CHECKS: Tuple[Tuple[Callable[[Slots], bool], str], ...] = (
+    (lambda s: not s.from_city or not s.from_iata_codes, "origin_city"),
+    (lambda s: not s.to_city or not s.to_iata_codes, "destination_city"),
+    (lambda s: not s.date, "departure_date"),
+    # For round trips, we need return date unless it's a range/month search
+    (lambda s: s.trip_type == TripType.ROUND_TRIP and not s.return_date and s.date_search_type == "exact", "return_date"),
+)
+
+
+@cache
+def _get_travelport() -> TravelportService:
+    """Shared TravelportService for hashing; constructing one per call also opened an HTTP client"""
+    
+    return TravelportService()
+
+
+def _search_hash_key(slots: Slots) -> Tuple[Any, ...]:
+    """Immutable tuple of exactly the slot fields TravelportService.get_search_hash covers"""
+    
+    return (
+        tuple(slots.from_iata_codes) if slots.from_iata_codes is not None else None,
+        tuple(slots.to_iata_codes) if slots.to_iata_codes is not None else None,
+        slots.date,
+        slots.return_date,
+        slots.passengers,
+        slots.trip_type,
+        slots.preferred_carrier
+    )
+
+
+@lru_cache(maxsize=512)
+def _search_hash(key: Tuple[Any, ...]) -> str:
+    """Search hash for a slot key tuple from _search_hash_key"""
+    
+    from_iata, to_iata, date_, return_date, passengers, trip_type, preferred_carrier = key
+    slots = Slots.model_construct(
+        from_iata_codes=list(from_iata) if from_iata is not None else None,
+        to_iata_codes=list(to_iata) if to_iata is not None else None,
+        date=date_,
+        return_date=return_date,
+        passengers=passengers,
+        trip_type=trip_type,
+        preferred_carrier=preferred_carrier
+    )
+    return _get_travelport().get_search_hash(slots)
 
 
 class AgentPolicies:
     """Decision policies for agent state transitions"""
     
+    __slots__ = ()
+    
+    # Nodes whose output is a pure function of the keyed state slice
+    _CACHE_POLICIES: Dict[str, NodeCachePolicy] = {
+        "reformulate": NodeCachePolicy(ttl=600, key_func=_reformulate_cache_key)
+    }
+    
+    @classmethod
+    def cache_policy_for(cls, node_name: str) -> Optional[NodeCachePolicy]:
+        """Return the cache policy for a node, or None if its output must not be reused"""
+        
+        return cls._CACHE_POLICIES.get(node_name)
+    
     @staticmethod
     def should_reformulate_query(state: AgentState) -> bool:
         """Determine if we should reformulate the user's query"""
@@ -48,7 +182,7 @@ class AgentPolicies:
             return True
         
         # Reformulate if the user message is significantly different from previous
-        if len(state.user_message.strip()) > 10:  # Non-trivial message
+        if len(state.stripped_user_message) > 10:  # Non-trivial message
             return True
         
         return False
@@ -71,13 +205,6 @@ class AgentPolicies:
         
         return False
     
-    @staticmethod
-    def should_plan_search(state: AgentState) -> bool:
-        """Determine if we should plan a search strategy"""
-        
-        # Plan search after slot filling
-        return True
-    
     @staticmethod
     def should_run_search(state: AgentState) -> bool:
         """Determine if we should execute a flight search"""
@@ -95,47 +222,27 @@ class AgentPolicies:
         """Determine if we should summarize search results"""
         
         # Summarize if we have results and no clarification needed
-        return (state.search_results is not None and 
-                len(state.search_results) > 0 and 
-                not state.needs_clarification)
-    
-    @staticmethod
-    def should_respond(state: AgentState) -> bool:
-        """Determine if we should generate a response"""
-        
-        # Always respond at the end
-        return True
+        return bool(state.search_results) and not state.needs_clarification
 
 
 class SlotValidationPolicies:
     """Policies for validating and checking slot completeness"""
     
+    __slots__ = ()
+    
     @staticmethod
     def get_missing_required_slots(slots: Slots) -> List[str]:
         """Get list of missing required slots"""
         
-        missing = []
-        
-        if not slots.from_city or not slots.from_iata_codes:
-            missing.append("origin_city")
-        
-        if not slots.to_city or not slots.to_iata_codes:
-            missing.append("destination_city")
-        
-        if not slots.date:
-            missing.append("departure_date")
-        
-        # For round trips, we need return date unless it's a range/month search
-        if (slots.trip_type == TripType.ROUND_TRIP and 
-            not slots.return_date and 
-            slots.date_search_type == "exact"):
-            missing.append("return_date")
+        return [label for check, label in _REQUIRED_SLOT_CHECKS if check(slots)]
+    
+    @staticmethod
+    def apply_slot_defaults(slots: Slots) -> None:
+        """Fill optional slots that have a sensible default"""
         
         # Passengers is optional but should default to 1
         if not slots.passengers:
             slots.passengers = 1
-        
-        return missing
     
     @staticmethod
     def validate_slot_values(slots: Slots) -> List[str]:
@@ -144,10 +251,10 @@ class SlotValidationPolicies:
         issues = []
         
         # Validate IATA codes
-        if slots.from_iata_codes and not all(len(code) == 3 for code in slots.from_iata_codes):
+        if slots.from_iata_codes and not all(map(_IATA_RE, slots.from_iata_codes)):
             issues.append("invalid_origin_airport_codes")
         
-        if slots.to_iata_codes and not all(len(code) == 3 for code in slots.to_iata_codes):
+        if slots.to_iata_codes and not all(map(_IATA_RE, slots.to_iata_codes)):
             issues.append("invalid_destination_airport_codes")
         
         # Validate passenger count
@@ -167,34 +274,38 @@ class SlotValidationPolicies:
     def _is_valid_date_format(date_str: str) -> bool:
         """Check if date string is in valid YYYY-MM-DD format"""
         
-        try:
-            parts = date_str.split('-')
-            if len(parts) != 3:
-                return False
-            
-            year, month, day = parts
-            return (len(year) == 4 and 
-                   len(month) == 2 and 
-                   len(day) == 2 and
-                   year.isdigit() and 
-                   month.isdigit() and 
-                   day.isdigit())
-        except:
-            return False
+        return _is_iso_date(date_str)
     
     @staticmethod
     def is_slots_complete_for_search(slots: Slots) -> bool:
         """Check if slots are complete enough for search"""
         
-        missing = SlotValidationPolicies.get_missing_required_slots(slots)
-        issues = SlotValidationPolicies.validate_slot_values(slots)
+        return not SlotValidationPolicies._any_missing(slots) and not SlotValidationPolicies._any_invalid(slots)
+    
+    @staticmethod
+    def _any_missing(slots: Slots) -> bool:
+        """Early-exit form of get_missing_required_slots"""
         
-        return len(missing) == 0 and len(issues) == 0
+        return any(check(slots) for check, _ in _REQUIRED_SLOT_CHECKS)
+    
+    @staticmethod
+    def _any_invalid(slots: Slots) -> bool:
+        """Early-exit form of validate_slot_values"""
+        
+        return bool(
+            (slots.from_iata_codes and not all(map(_IATA_RE, slots.from_iata_codes))) or
+            (slots.to_iata_codes and not all(map(_IATA_RE, slots.to_iata_codes))) or
+            (slots.passengers and (slots.passengers < 1 or slots.passengers > 9)) or
+            (slots.date and not _is_iso_date(slots.date)) or
+            (slots.return_date and not _is_iso_date(slots.return_date))
+        )
 
 
 class SearchPolicies:
     """Policies for determining search strategy and parameters"""
     
+    __slots__ = ()
+    
     @staticmethod
     def determine_search_type(slots: Slots) -> str:
         """Determine the type of search needed"""
@@ -219,9 +330,8 @@ class SearchPolicies:
         if not state.conversation_data.last_completed_search:
             return False
         
-        # Generate current search hash
-        from ..services.travelport import TravelportService
-        current_hash = TravelportService().get_search_hash(state.conversation_data.slots)
+        # Generate current search hash (memoized on the hashed slot fields)
+        current_hash = _search_hash(_search_hash_key(state.conversation_data.slots))
         
         return current_hash == state.conversation_data.last_completed_search
     
@@ -231,17 +341,11 @@ class SearchPolicies:
         
         priorities = []
         
-        # Prioritize main airports for major cities
-        major_airports = {
-            "LHR", "JFK", "CDG", "DXB", "SIN", "NRT", "HND", 
-            "FRA", "AMS", "MAD", "BCN", "FCO", "MXP"
-        }
-        
         if slots.from_iata_codes:
             # Sort by major airports first
             sorted_origins = sorted(
                 slots.from_iata_codes,
-                key=lambda x: (x not in major_airports, x)
+                key=lambda x: (x not in _MAJOR_AIRPORTS, x)
             )
             priorities.extend(sorted_origins)
         
@@ -264,11 +368,25 @@ class SearchPolicies:
             return min(total_combinations, 9)  # Max 9 for range search
         else:
             return min(total_combinations, 12)  # Max 12 for exact search
+    
+    @staticmethod
+    def iter_search_combinations(slots: Slots, max_per_side: Optional[int] = None) -> Iterator[Tuple[str, str]]:
+        """Yield (origin, destination) pairs, major origins first, capped at get_max_search_combinations"""
+        
+        origins = SearchPolicies.get_search_priority_order(slots)
+        destinations = slots.to_iata_codes or []
+        if max_per_side is not None:
+            origins, destinations = origins[:max_per_side], destinations[:max_per_side]
+        
+        cap = SearchPolicies.get_max_search_combinations(slots)
+        return itertools.islice(itertools.product(origins, destinations), cap)
 
 
 class ResponsePolicies:
     """Policies for response generation and formatting"""
     
+    __slots__ = ()
+    
     @staticmethod
     def should_include_alternatives(state: AgentState) -> bool:
         """Determine if we should include alternative options"""
@@ -292,9 +410,9 @@ class ResponsePolicies:
         
         slots = state.conversation_data.slots
         
-        return (not state.search_results and
-                ((slots.from_iata_codes and len(slots.from_iata_codes) == 1) or
-                 (slots.to_iata_codes and len(slots.to_iata_codes) == 1)))
+        return bool(not state.search_results and
+                    ((slots.from_iata_codes and len(slots.from_iata_codes) == 1) or
+                     (slots.to_iata_codes and len(slots.to_iata_codes) == 1)))
     
     @staticmethod
     def get_response_tone(state: AgentState) -> str:
@@ -302,7 +420,7 @@ class ResponsePolicies:
         
         if state.needs_clarification:
             return "helpful_questioning"
-        elif state.search_results and len(state.search_results) > 0:
+        elif state.search_results:
             return "enthusiastic_presenting"
         elif not state.search_results:
             return "empathetic_suggesting"
@@ -314,14 +432,14 @@ class ResponsePolicies:
         """Determine if we should include booking guidance"""
         
         # Include booking guidance if we have good results
-        return (state.search_results and 
-                len(state.search_results) > 0 and
-                not state.needs_clarification)
+        return bool(state.search_results) and not state.needs_clarification
 
 
 class TransitionConditions:
     """Main class for determining graph transitions"""
     
+    __slots__ = ("policies", "slot_policies", "search_policies", "response_policies")
+    
     def __init__(self):
         self.policies = AgentPolicies()
         self.slot_policies = SlotValidationPolicies()
@@ -341,13 +459,13 @@ class TransitionConditions:
         
         return NodeDecision.PLAN_SEARCH
     
-    def next_node_after_plan_search(self, state: AgentState) -> NodeDecision:
-        """Determine next node after search planning"""
+    def next_node_after_plan_and_run_search(self, state: AgentState) -> NodeDecision:
+        """Determine next node after the fused plan + search step"""
         
         if state.needs_clarification:
             return NodeDecision.CLARIFY
         elif state.should_search:
-            return NodeDecision.RUN_SEARCH
+            return self.next_node_after_search(state)
         else:
             return NodeDecision.RESPOND
     
@@ -378,37 +496,29 @@ class TransitionConditions:
         """Determine if conversation should continue"""
         
         # Continue if we're still clarifying or collecting information
-        return (state.conversation_data.state in [
-            ConversationState.INITIAL,
-            ConversationState.COLLECTING_SLOTS,
-            ConversationState.CLARIFYING
-        ])
+        return state.conversation_data.state in _ACTIVE_STATES
     
     def get_transition_reason(self, current_node: str, next_decision: NodeDecision, state: AgentState) -> str:
         """Get human-readable reason for transition decision"""
         
-        reasons = {
-            (NodeDecision.FILL_SLOTS): "Need to extract travel information from user message",
-            (NodeDecision.PLAN_SEARCH): "Ready to plan flight search strategy",
-            (NodeDecision.RUN_SEARCH): "All required information available, executing search",
-            (NodeDecision.CLARIFY): "Missing required information, need user clarification",
-            (NodeDecision.SUMMARIZE): "Multiple results found, preparing summary",
-            (NodeDecision.RESPOND): "Ready to generate final response",
-            (NodeDecision.END): "Conversation completed"
-        }
-        
-        return reasons.get(next_decision, f"Transitioning to {next_decision}")
+        return _TRANSITION_REASONS.get(next_decision, f"Transitioning to {next_decision.label}")
     
     def log_transition_decision(self, current_node: str, next_decision: NodeDecision, state: AgentState) -> None:
         """Log the transition decision with reasoning"""
         
+        # Runs on every edge; skip building the reason and extras when INFO is off
+        if not logger.isEnabledFor(logging.INFO):
+            return
+        
         reason = self.get_transition_reason(current_node, next_decision, state)
         
         logger.info(
-            f"Graph transition: {current_node} -> {next_decision}",
+            "Graph transition: %s -> %s",
+            current_node,
+            next_decision.label,
             extra={
                 "current_node": current_node,
-                "next_node": next_decision,
+                "next_node": next_decision.label,
                 "reason": reason,
                 "conversation_state": state.conversation_data.state,
                 "has_search_results": bool(state.search_results),
@@ -2,13 +2,16 @@
 Application configuration using Pydantic BaseSettings
 """
 
-from pydantic_settings import BaseSettings
+from functools import cache
+from pydantic_settings import BaseSettings, SettingsConfigDict
 from typing import Optional
 
 
 class Settings(BaseSettings):
     """Application settings from environment variables"""
     
+    model_config = SettingsConfigDict(env_file=".env", case_sensitive=False)
+    
     # OpenAI Configuration
     openai_api_key: str
     
@@ -33,20 +36,38 @@ class Settings(BaseSettings):
     
     # DynamoDB Configuration
     dynamodb_table_name: str = "tazaticket-conversations"
+    dynamodb_messages_table_name: str = "tazaticket-messages"
+    dax_endpoint: Optional[str] = None  # e.g., "daxs://my-cluster.xxxx.dax-clusters.eu-north-1.amazonaws.com"
+    
+    # Redis Configuration (optional shared conversation cache)
+    redis_url: Optional[str] = None
+    redis_conversation_ttl: int = 300
+    
+    # Query reformulator: reuse outputs for near-duplicate messages (one embedding call per miss)
+    reformulator_semantic_cache: bool = False
     
     # Application Configuration
     app_timezone: str = "Europe/London"
     log_level: str = "INFO"
     
+    # Inbound message processing: bounded queue drained by a fixed worker pool
+    message_queue_size: int = 1000
+    message_workers: Optional[int] = None  # default: 2 x CPU count, at least 16 (the pipeline is I/O bound)
+    
     # API URLs
     travelport_oauth_url: str = "https://oauth.pp.travelport.com/oauth/oauth20/token"
     travelport_catalog_url: str = "https://api.pp.travelport.com/11/air/catalog/search/catalogproductofferings"
     travelport_airprice_url: str = "https://api.pp.travelport.com/11/air/price/offers/buildfromcatalogproductofferings"
-    
-    class Config:
-        env_file = ".env"
-        case_sensitive = False
 
 
-# Global settings instance
-settings = Settings() 
\ No newline at end of file
+@cache
+def get_settings() -> Settings:
+    """Return the process-wide settings, reading the environment on first use"""
+    return Settings()
+
+
+def __getattr__(name: str):
+    # Keep `from app.config import settings` working for scripts without validating at import
+    if name == "settings":
+        return get_settings()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}") 
\ No newline at end of file
@@ -2,141 +2,370 @@
 DynamoDB repository for conversation state and history management
 """
 
+import asyncio
 import json
+import random
+import time
+from collections import OrderedDict
 from datetime import datetime
-from typing import Optional, List, Dict, Any
+from functools import cache, lru_cache
+from typing import Optional, List, Dict, Any, Tuple
 from decimal import Decimal
 import boto3
+import orjson
 from boto3.dynamodb.conditions import Key
+from boto3.dynamodb.types import Binary, TypeDeserializer, TypeSerializer
+from botocore.config import Config
 from botocore.exceptions import ClientError
 
-from ..config import settings
-from ..models.schemas import ConversationData, Message, Slots, ConversationState, MessageModality
+from ..config import get_settings
+from ..models.schemas import (
+    ConversationData, ConversationSummary, Message, Slots, ConversationState, MessageModality, TripType
+)
 from ..utils.errors import DynamoDBError
 from ..utils.logging import get_logger
 
+try:
+    import ciso8601
+except ImportError:  # optional; datetime.fromisoformat is the C fallback
+    ciso8601 = None
+
 logger = get_logger(__name__)
 
+# ISO timestamp parser for deserialization (ciso8601 when installed)
+_parse_iso = ciso8601.parse_datetime if ciso8601 is not None else datetime.fromisoformat
+
+
+@lru_cache(maxsize=2048)
+def _decimal_to_number(value: Decimal) -> Any:
+    """Convert a DynamoDB number, memoized since prices and counts repeat across reads"""
+    # Integral numbers stay ints: unvalidated models (see _construct_conversation) are not coerced
+    return int(value) if value == value.to_integral_value() else float(value)
+
+
+@lru_cache(maxsize=2048)
+def _parse_decimal(value: str) -> Decimal:
+    """json parse_float hook, memoized like _decimal_to_number (Decimals are immutable)"""
+    return Decimal(value)
+
+
+def _decimal_default(obj: Any) -> Any:
+    """orjson fallback for DynamoDB types: Decimal numbers and string/number sets"""
+    # Exact type checks: boto3 only ever hands back these concrete types
+    obj_type = type(obj)
+    if obj_type is Decimal:
+        return _decimal_to_number(obj)
+    if obj_type is set or obj_type is frozenset:
+        return list(obj)
+    raise TypeError(f"Type is not JSON serializable: {type(obj).__name__}")
+
+
+# Keep-alive pooled connections with short timeouts; a single round-trip dominates request latency
+_BOTO_CONFIG = Config(
+    max_pool_connections=64,
+    tcp_keepalive=True,
+    retries={'max_attempts': 3, 'mode': 'adaptive'},
+    connect_timeout=1.0,
+    read_timeout=3.0
+)
+
+
+# Default slots for items saved without any; _construct_slots copies it, so sharing is safe
+_EMPTY_SLOTS_DICT: Dict[str, Any] = Slots().model_dump()
+
+# Built once and shared: only used for attributes outside the hand-decoded S/B fast path,
+# and for message items written through the low-level client
+_DESERIALIZER = TypeDeserializer()
+_SERIALIZER = TypeSerializer()
+
+# Sort key attribute of the stable per-user CURRENT pointer record
+_CURRENT_SORT_KEY: Dict[str, Any] = {'sort_key': {'S': 'CURRENT'}}
+
+
+@cache
+def _get_boto_session() -> boto3.session.Session:
+    """Process-wide boto3 session shared by every repository instance"""
+    return boto3.session.Session()
+
+
+@lru_cache(maxsize=4096)
+def _cached_parse_iso(value: str) -> datetime:
+    """Parse an ISO timestamp, memoized since reloaded history repeats the same strings (datetimes are immutable)"""
+    return _parse_iso(value)
+
+
+def _construct_message(data: Dict[str, Any]) -> Message:
+    """Build a Message from stored data without validation, converting only enum and datetime fields"""
+    fields = dict(data)
+    fields['modality'] = MessageModality(fields['modality'])
+    fields['timestamp'] = _cached_parse_iso(fields['timestamp'])  # always an ISO string in storage
+    return Message.model_construct(**fields)
+
+
+def _construct_slots(data: Dict[str, Any]) -> Slots:
+    """Build Slots from stored data without validation"""
+    fields = dict(data)
+    if fields.get('trip_type') is not None:
+        fields['trip_type'] = TripType(fields['trip_type'])
+    return Slots.model_construct(**fields)
+
+
+def _construct_conversation(data: Dict[str, Any]) -> ConversationData:
+    """Build ConversationData from data this repository wrote, skipping Pydantic validation"""
+    fields = dict(data)
+    fields['slots'] = _construct_slots(fields['slots']) if fields.get('slots') is not None else Slots()
+    fields['messages'] = [_construct_message(message) for message in fields.get('messages') or []]
+    if fields.get('state') is not None:
+        fields['state'] = ConversationState(fields['state'])
+    else:
+        fields.pop('state', None)
+    if fields.get('last_modality') is not None:
+        fields['last_modality'] = MessageModality(fields['last_modality'])
+    for key in ('created_at', 'updated_at'):
+        if isinstance(fields.get(key), str):
+            fields[key] = _cached_parse_iso(fields[key])
+    return ConversationData.model_construct(**fields)
+
 
 class DynamoDBRepository:
     """DynamoDB repository for conversation data management"""
     
-    def __init__(self):
-        self.dynamodb = boto3.resource(
+    def __init__(self, use_dax: Optional[bool] = None):
+        settings = get_settings()
+        self.dynamodb = _get_boto_session().resource(
             'dynamodb',
             region_name=settings.aws_region,
             aws_access_key_id=settings.aws_access_key_id,
-            aws_secret_access_key=settings.aws_secret_access_key
+            aws_secret_access_key=settings.aws_secret_access_key,
+            config=_BOTO_CONFIG
         )
-        self.table = self.dynamodb.Table(settings.dynamodb_table_name)
+        
+        # Route item reads/writes through DAX when an endpoint is configured; DAX has no
+        # control-plane API, so the plain resource is kept for table metadata (health checks)
+        if use_dax is None:
+            use_dax = bool(settings.dax_endpoint)
+        self.data_resource = self.dynamodb
+        if use_dax:
+            from amazondax import AmazonDaxClient
+            self.data_resource = AmazonDaxClient.resource(
+                endpoint_url=settings.dax_endpoint,
+                region_name=settings.aws_region,
+                aws_access_key_id=settings.aws_access_key_id,
+                aws_secret_access_key=settings.aws_secret_access_key
+            )
+            logger.info(f"Using DAX endpoint for DynamoDB item access: {settings.dax_endpoint}")
+        
+        self.table_name = settings.dynamodb_table_name
+        self.table = self.data_resource.Table(settings.dynamodb_table_name)
+        self.messages_table_name = settings.dynamodb_messages_table_name
+        self.messages_table = self.data_resource.Table(settings.dynamodb_messages_table_name)
+        
+        # Low-level API for snapshot items: their fixed user_id/sort_key/payload shape is encoded by hand,
+        # skipping the resource layer's per-value TypeSerializer/TypeDeserializer walk
+        self.client = self.data_resource.meta.client
+        
+        # Short-lived LRU of deserialized conversations so back-to-back webhooks skip the read;
+        # saves write through and in-place updates invalidate
+        self._conversation_cache: "OrderedDict[str, Tuple[ConversationData, float]]" = OrderedDict()
+        self.conversation_cache_size = 1024
+        self.conversation_cache_ttl = 5.0
+        
+        # BatchGetItem/BatchWriteItem retries for unprocessed (throttled) keys and items
+        self.batch_max_attempts = 5
+        self.batch_base_delay = 0.05
+    
+    def _get_cached_conversation(self, user_id: str) -> Optional[ConversationData]:
+        """Return a cached conversation if it is still fresh"""
+        
+        entry = self._conversation_cache.get(user_id)
+        if entry is None:
+            return None
+        
+        conversation_data, stored_at = entry
+        if time.monotonic() - stored_at > self.conversation_cache_ttl:
+            del self._conversation_cache[user_id]
+            return None
+        
+        self._conversation_cache.move_to_end(user_id)
+        return conversation_data
+    
+    def _cache_conversation(self, conversation_data: ConversationData) -> None:
+        """Remember a conversation, evicting the least recently used entries"""
+        
+        self._conversation_cache[conversation_data.user_id] = (conversation_data, time.monotonic())
+        self._conversation_cache.move_to_end(conversation_data.user_id)
+        while len(self._conversation_cache) > self.conversation_cache_size:
+            self._conversation_cache.popitem(last=False)
+    
+    def _invalidate_conversation(self, user_id: str) -> None:
+        """Drop a cached conversation after a partial update"""
+        
+        self._conversation_cache.pop(user_id, None)
     
     def _decimal_to_float(self, obj):
         """Convert Decimal objects to float for JSON serialization"""
-        if isinstance(obj, Decimal):
-            return float(obj)
-        elif isinstance(obj, dict):
-            return {k: self._decimal_to_float(v) for k, v in obj.items()}
-        elif isinstance(obj, list):
-            return [self._decimal_to_float(v) for v in obj]
-        return obj
+        # orjson walks the tree in C; Decimals come back as floats
+        return orjson.loads(orjson.dumps(obj, default=_decimal_default))
     
     def _float_to_decimal(self, obj):
         """Convert float objects to Decimal for DynamoDB storage"""
-        if isinstance(obj, float):
-            return Decimal(str(obj))
-        elif isinstance(obj, dict):
-            return {k: self._float_to_decimal(v) for k, v in obj.items()}
-        elif isinstance(obj, list):
-            return [self._float_to_decimal(v) for v in obj]
-        return obj
+        # orjson walks the tree in C (datetimes and enums become ISO strings and values);
+        # floats are re-read as Decimal from their shortest repr, like Decimal(str(f))
+        return json.loads(orjson.dumps(obj), parse_float=_parse_decimal)
     
     def _serialize_conversation_data(self, conversation_data: ConversationData) -> Dict[str, Any]:
-        """Serialize ConversationData for DynamoDB storage"""
+        """Serialize ConversationData for DynamoDB storage as a single orjson payload"""
         
-        # Convert to dict
-        data = conversation_data.dict()
+        # One binary attribute: no per-field Decimal conversion and a smaller item.
+        # Messages reuse their cached dumps, so only new messages are serialized per save
+        data = conversation_data.model_dump(mode="json", exclude={'messages'})
+        data['messages'] = [self._dump_message(message) for message in conversation_data.messages]
+        return {'payload': orjson.dumps(data)}
+    
+    @staticmethod
+    def _dump_message(message: Message) -> Dict[str, Any]:
+        """JSON-mode dump of a message, computed once per Message instance"""
         
-        # Convert floats to Decimals for DynamoDB
-        data = self._float_to_decimal(data)
+        dumped = getattr(message, '_json_cache', None)
+        if dumped is None:
+            dumped = message.model_dump(mode="json")
+            message._json_cache = dumped
+        return dumped
+    
+    @staticmethod
+    def _encode_snapshot_item(user_id: str, sort_key: str, payload: bytes) -> Dict[str, Any]:
+        """Build the AttributeValue map for a conversation snapshot item"""
+        return {'user_id': {'S': user_id}, 'sort_key': {'S': sort_key}, 'payload': {'B': payload}}
+    
+    @staticmethod
+    def _decode_item(raw: Dict[str, Any]) -> Dict[str, Any]:
+        """Convert a low-level AttributeValue map to plain Python values"""
+        item = {}
+        for key, value in raw.items():
+            if 'S' in value:
+                item[key] = value['S']
+            elif 'B' in value:
+                item[key] = value['B']
+            else:
+                item[key] = _DESERIALIZER.deserialize(value)
+        return item
+    
+    def _deserialize_payload_item(self, item: Dict[str, Any]) -> ConversationData:
+        """Deserialize an item stored with a single orjson payload"""
         
-        # Convert datetime objects to ISO strings
-        data['created_at'] = conversation_data.created_at.isoformat()
-        data['updated_at'] = conversation_data.updated_at.isoformat()
+        payload = item['payload']
+        data = orjson.loads(payload.value if isinstance(payload, Binary) else payload)
         
-        # Convert message timestamps
-        for message in data['messages']:
-            message['timestamp'] = message['timestamp'] if isinstance(message['timestamp'], str) else message['timestamp'].isoformat()
+        # Attributes SET in place after the last full save (see update_conversation_fields) are newer
+        overrides = {k: v for k, v in item.items() if k not in ['user_id', 'sort_key', 'payload']}
+        if overrides:
+            data.update(self._decimal_to_float(overrides))
         
-        return data
+        data['user_id'] = item['user_id']
+        return _construct_conversation(data)
     
     def _deserialize_conversation_data(self, item: Dict[str, Any]) -> ConversationData:
         """Deserialize DynamoDB item to ConversationData"""
         
+        if 'payload' in item:
+            return self._deserialize_payload_item(item)
+        
+        # Legacy items store each field as its own attribute
         # Convert Decimals to floats
         item = self._decimal_to_float(item)
         
-        # Convert ISO strings back to datetime objects
-        if 'created_at' in item and isinstance(item['created_at'], str):
-            item['created_at'] = datetime.fromisoformat(item['created_at'])
-        
-        if 'updated_at' in item and isinstance(item['updated_at'], str):
-            item['updated_at'] = datetime.fromisoformat(item['updated_at'])
-        
-        # Convert message timestamps
-        for message in item.get('messages', []):
-            if 'timestamp' in message and isinstance(message['timestamp'], str):
-                message['timestamp'] = datetime.fromisoformat(message['timestamp'])
-        
         # Ensure required fields exist with defaults
         if 'slots' not in item or item['slots'] is None:
-            from ..models.schemas import Slots
-            item['slots'] = Slots().dict()
+            item['slots'] = _EMPTY_SLOTS_DICT
         
-        if 'messages' not in item or item['messages'] is None:
-            item['messages'] = []
-        
-        # Remove DynamoDB-specific keys that shouldn't be in ConversationData
+        # Remove DynamoDB-specific keys that shouldn't be in ConversationData; ISO strings,
+        # enums and missing messages are converted while constructing
         item_clean = {k: v for k, v in item.items() if k not in ['user_id', 'sort_key']}
         
         # Re-add user_id as it's needed
         item_clean['user_id'] = item['user_id']
         
-        return ConversationData(**item_clean)
+        return _construct_conversation(item_clean)
+    
+    @staticmethod
+    def _deserialize_summary_item(item: Dict[str, Any]) -> ConversationSummary:
+        """Build a ConversationSummary from a projected history item"""
+        
+        sort_key = item['sort_key']
+        # Snapshot sort keys are their save timestamps; CURRENT records carry updated_at
+        updated_at = item.get('updated_at') or (sort_key if sort_key != 'CURRENT' else None)
+        state = item.get('state')
+        return ConversationSummary.model_construct(
+            user_id=item['user_id'],
+            sort_key=sort_key,
+            state=ConversationState(state) if state else None,
+            updated_at=_cached_parse_iso(updated_at) if updated_at else None,
+            last_itinerary_summary=item.get('last_itinerary_summary')
+        )
+    
+    def _serialize_message(self, user_id: str, message: Message, turn_seq: int) -> Dict[str, Any]:
+        """Serialize a single Message as a messages-table AttributeValue map"""
+        
+        # The cached JSON-mode dump already holds the ISO timestamp and modality value, and
+        # Message has no float fields, so no per-field type checks or Decimal walk are needed
+        item = dict(self._dump_message(message))
+        item['user_id'] = user_id
+        item['turn_seq'] = turn_seq
+        return {k: _SERIALIZER.serialize(v) for k, v in item.items() if v is not None}
+    
+    def _deserialize_message(self, item: Dict[str, Any]) -> Message:
+        """Deserialize a messages-table item to a Message"""
+        
+        # turn_seq is the only numeric attribute, so once the keys are dropped there is nothing
+        # left for _decimal_to_float to convert
+        item_clean = {k: v for k, v in item.items() if k not in ['user_id', 'turn_seq']}
+        return _construct_message(item_clean)
     
-    async def get_conversation(self, user_id: str) -> Optional[ConversationData]:
+    async def get_conversation(self, user_id: str, consistent_read: bool = False) -> Optional[ConversationData]:
         """
         Get the latest conversation state for a user
         
         Args:
             user_id: User identifier
+            consistent_read: Bypass the cache and use a strongly consistent read
             
         Returns:
             ConversationData if found, None otherwise
         """
         
+        if not consistent_read:
+            cached = self._get_cached_conversation(user_id)
+            if cached is not None:
+                return cached
+        
         try:
             logger.info(f"Retrieving conversation for user: {user_id}")
             
             # First try to read a stable 'CURRENT' record (if present)
             try:
-                current_item_resp = self.table.get_item(
-                    Key={'user_id': user_id, 'sort_key': 'CURRENT'},
-                    ConsistentRead=True
+                current_item_resp = await asyncio.to_thread(
+                    self.client.get_item,
+                    TableName=self.table_name,
+                    Key={'user_id': {'S': user_id}, 'sort_key': {'S': 'CURRENT'}},
+                    ConsistentRead=consistent_read  # CURRENT is rewritten on every save; eventual reads suffice
                 )
                 current_item = current_item_resp.get('Item')
                 if current_item:
-                    conversation_data = self._deserialize_conversation_data(current_item)
+                    conversation_data = self._deserialize_conversation_data(self._decode_item(current_item))
                     logger.info(f"Retrieved conversation for user: {user_id}, {len(conversation_data.messages)} messages")
+                    self._cache_conversation(conversation_data)
                     return conversation_data
             except Exception:
                 # Fall back to query
                 pass
             
             # Query for the latest conversation entry for this user
-            response = self.table.query(
+            response = await asyncio.to_thread(
+                self.table.query,
                 KeyConditionExpression=Key('user_id').eq(user_id),
                 ScanIndexForward=False,  # Sort in descending order (latest first)
-                Limit=1
+                Limit=1,
+                ConsistentRead=consistent_read
             )
             
             items = response.get('Items', [])
@@ -146,6 +375,7 @@ class DynamoDBRepository:
             
             conversation_data = self._deserialize_conversation_data(items[0])
             logger.info(f"Retrieved conversation for user: {user_id}, {len(conversation_data.messages)} messages")
+            self._cache_conversation(conversation_data)
             
             return conversation_data
             
@@ -154,6 +384,81 @@ class DynamoDBRepository:
             logger.error(error_msg)
             raise DynamoDBError(error_msg)
     
+    async def get_conversation_strong(self, user_id: str) -> Optional[ConversationData]:
+        """
+        Get the latest conversation state for a user with a strongly consistent read
+        
+        Used by read-modify-write state transitions, which must not act on a stale record.
+        
+        Args:
+            user_id: User identifier
+            
+        Returns:
+            ConversationData if found, None otherwise
+        """
+        
+        return await self.get_conversation(user_id, consistent_read=True)
+    
+    async def batch_get_conversations(self, user_ids: List[str]) -> Dict[str, Optional[ConversationData]]:
+        """
+        Get the latest conversation state for several users with BatchGetItem
+        
+        Args:
+            user_ids: User identifiers
+            
+        Returns:
+            Mapping of user_id to ConversationData, or None if the user has no conversation
+        """
+        
+        results: Dict[str, Optional[ConversationData]] = {}
+        table_name = self.table_name
+        
+        for user_id in user_ids:
+            cached = self._get_cached_conversation(user_id)
+            if cached is not None:
+                results[user_id] = cached
+        to_fetch = [user_id for user_id in user_ids if user_id not in results]
+        
+        try:
+            # BatchGetItem accepts at most 100 keys per request
+            for start in range(0, len(to_fetch), 100):
+                request = {
+                    table_name: {
+                        'Keys': [{'user_id': {'S': user_id}, 'sort_key': {'S': 'CURRENT'}} for user_id in to_fetch[start:start + 100]],
+                        'ConsistentRead': False
+                    }
+                }
+                for attempt in range(self.batch_max_attempts):
+                    response = await asyncio.to_thread(self.client.batch_get_item, RequestItems=request)
+                    for raw in response.get('Responses', {}).get(table_name, []):
+                        item = self._decode_item(raw)
+                        conversation_data = self._deserialize_conversation_data(item)
+                        self._cache_conversation(conversation_data)
+                        results[item['user_id']] = conversation_data
+                    request = response.get('UnprocessedKeys')
+                    if not request:
+                        break
+                    # Throttled; back off with full jitter before resubmitting the unprocessed keys
+                    if attempt < self.batch_max_attempts - 1:
+                        await asyncio.sleep(random.uniform(0, self.batch_base_delay * (2 ** attempt)))
+                else:
+                    # Keys still unprocessed are read individually by the fallback below
+                    logger.warning(f"{len(request[table_name]['Keys'])} keys still unprocessed after {self.batch_max_attempts} BatchGetItem attempts")
+        except ClientError as e:
+            error_msg = f"Failed to batch retrieve conversations for {len(user_ids)} users: {str(e)}"
+            logger.error(error_msg)
+            raise DynamoDBError(error_msg)
+        
+        # Users without a CURRENT record may still have older timestamped snapshots, and
+        # keys left unprocessed by throttling still need reading
+        missing = [user_id for user_id in user_ids if user_id not in results]
+        if missing:
+            fallbacks = await asyncio.gather(*(self.get_conversation(user_id) for user_id in missing))
+            results.update(zip(missing, fallbacks))
+        
+        logger.info(f"Batch retrieved conversations for {len(user_ids)} users")
+        return results
+    
     async def save_conversation(self, conversation_data: ConversationData) -> None:
         """
         Save conversation state to DynamoDB
@@ -168,21 +473,27 @@ class DynamoDBRepository:
             # Update the updated_at timestamp
             conversation_data.updated_at = datetime.utcnow()
             
-            # Serialize for DynamoDB
-            item = self._serialize_conversation_data(conversation_data)
-            
-            # Add DynamoDB keys to match table schema (versioned record)
-            item['user_id'] = conversation_data.user_id  # Partition key
-            item['sort_key'] = conversation_data.updated_at.isoformat()  # Sort key
-            
-            # Save versioned record
-            self.table.put_item(Item=item)
-            
-            # Also save/overwrite a stable 'CURRENT' pointer for fast reads
-            current_item = dict(item)
-            current_item['sort_key'] = 'CURRENT'
-            self.table.put_item(Item=current_item)
+            # Serialize for DynamoDB, keyed to match table schema (versioned record)
+            item = self._encode_snapshot_item(
+                conversation_data.user_id,  # Partition key
+                conversation_data.updated_at.isoformat(),  # Sort key
+                self._serialize_conversation_data(conversation_data)['payload']
+            )
+            # Summary attributes beside the payload, so history listings can project them alone
+            item['state'] = {'S': conversation_data.state.value}
+            if conversation_data.last_itinerary_summary:
+                item['last_itinerary_summary'] = {'S': conversation_data.last_itinerary_summary}
+            
+            # Also save/overwrite a stable 'CURRENT' pointer for fast reads; the items differ only
+            # in sort_key, so merge that over the serialized item (sharing every attribute value)
+            # and write both in one BatchWriteItem round-trip
+            current_item = item | _CURRENT_SORT_KEY
+            await asyncio.to_thread(
+                self._batch_write_all,
+                [{'PutRequest': {'Item': item}}, {'PutRequest': {'Item': current_item}}]
+            )
             
+            self._cache_conversation(conversation_data)
             logger.info(f"Saved conversation for user: {conversation_data.user_id}")
             
         except ClientError as e:
@@ -190,19 +501,36 @@ class DynamoDBRepository:
             logger.error(error_msg)
             raise DynamoDBError(error_msg)
     
-    async def append_message(self, user_id: str, message: Message) -> ConversationData:
+    async def append_message(
+        self,
+        user_id: str,
+        message: Message,
+        return_conversation: bool = False
+    ) -> Optional[ConversationData]:
         """
         Append a message to the conversation history
         
         Args:
             user_id: User identifier
             message: Message to append
+            return_conversation: Read back and return the full conversation (read-modify-write)
             
         Returns:
-            Updated conversation data
+            Updated conversation data if return_conversation, otherwise None
         """
         
         try:
+            if not return_conversation:
+                # Write only the new message and the fields it changes: no read, no history re-serialization
+                fields = {'last_modality': message.modality.value}
+                if message.language:
+                    fields['language'] = message.language
+                await self.put_messages(user_id, [message])
+                await self.update_conversation_fields(user_id, fields)  # invalidates the cached snapshot
+                
+                logger.info(f"Appended message for user: {user_id}")
+                return None
+            
             # Get existing conversation or create new one
             conversation_data = await self.get_conversation(user_id)
             
@@ -235,6 +563,102 @@ class DynamoDBRepository:
             logger.error(error_msg)
             raise DynamoDBError(error_msg)
     
+    async def put_messages(self, user_id: str, messages: List[Message]) -> None:
+        """
+        Append messages as individual items in the messages table
+        
+        Args:
+            user_id: User identifier
+            messages: New messages to persist, in conversation order
+        """
+        
+        try:
+            items = []
+            for index, message in enumerate(messages):
+                # Microsecond timestamp keeps items ordered; the index separates messages stamped together
+                turn_seq = int(message.timestamp.timestamp() * 1_000_000) + index
+                items.append(self._serialize_message(user_id, message, turn_seq))
+            await asyncio.to_thread(self._write_message_items, items)
+            
+            logger.info(f"Persisted {len(messages)} messages for user: {user_id}")
+            
+        except ClientError as e:
+            error_msg = f"Failed to persist messages for user {user_id}: {str(e)}"
+            logger.error(error_msg)
+            raise DynamoDBError(error_msg)
+    
+    async def get_recent_messages(self, user_id: str, limit: int = 10) -> List[Message]:
+        """
+        Get the most recent messages for a user
+        
+        Args:
+            user_id: User identifier
+            limit: Maximum number of messages to retrieve
+            
+        Returns:
+            Messages in chronological order
+        """
+        
+        try:
+            response = await asyncio.to_thread(
+                self.messages_table.query,
+                KeyConditionExpression=Key('user_id').eq(user_id),
+                ScanIndexForward=False,  # Latest first
+                Limit=limit
+            )
+            
+            items = response.get('Items', [])
+            return [self._deserialize_message(item) for item in reversed(items)]
+            
+        except ClientError as e:
+            error_msg = f"Failed to retrieve messages for user {user_id}: {str(e)}"
+            logger.error(error_msg)
+            raise DynamoDBError(error_msg)
+    
+    def _write_message_items(self, items: List[Dict[str, Any]]) -> None:
+        """Write serialized message items to the messages table in batches (blocking)"""
+        
+        # Items are already AttributeValue maps, so the client skips the resource layer's re-serialization
+        for start in range(0, len(items), 25):
+            self._batch_write_all(
+                [{'PutRequest': {'Item': item}} for item in items[start:start + 25]],
+                self.messages_table_name
+            )
+    
+    async def update_conversation_fields(self, user_id: str, fields: Dict[str, Any]) -> None:
+        """
+        Update selected attributes of the CURRENT conversation record in place
+        
+        Args:
+            user_id: User identifier
+            fields: Attribute names mapped to their new (already serializable) values
+        """
+        
+        try:
+            fields = dict(fields)
+            fields['updated_at'] = datetime.utcnow().isoformat()
+            
+            # Placeholders for every name since attributes like 'state' are reserved words
+            names = {f"#f{i}": name for i, name in enumerate(fields)}
+            values = {f":v{i}": self._float_to_decimal(value) for i, value in enumerate(fields.values())}
+            update_expression = "SET " + ", ".join(f"#f{i} = :v{i}" for i in range(len(fields)))
+            
+            await asyncio.to_thread(
+                self.table.update_item,
+                Key={'user_id': user_id, 'sort_key': 'CURRENT'},
+                UpdateExpression=update_expression,
+                ExpressionAttributeNames=names,
+                ExpressionAttributeValues=values
+            )
+            
+            self._invalidate_conversation(user_id)
+            logger.info(f"Updated conversation fields for user: {user_id}")
+            
+        except ClientError as e:
+            error_msg = f"Failed to update conversation fields for user {user_id}: {str(e)}"
+            logger.error(error_msg)
+            raise DynamoDBError(error_msg)
+    
     async def update_slots(self, user_id: str, slots: Slots) -> ConversationData:
         """
         Update conversation slots
@@ -249,7 +673,7 @@ class DynamoDBRepository:
         
         try:
             # Get existing conversation
-            conversation_data = await self.get_conversation(user_id)
+            conversation_data = await self.get_conversation_strong(user_id)
             
             if conversation_data is None:
                 # Create new conversation
@@ -298,7 +722,7 @@ class DynamoDBRepository:
         
         try:
             # Get existing conversation
-            conversation_data = await self.get_conversation(user_id)
+            conversation_data = await self.get_conversation_strong(user_id)
             
             if conversation_data is None:
                 raise DynamoDBError(f"No conversation found for user {user_id}")
@@ -328,33 +752,39 @@ class DynamoDBRepository:
         self, 
         user_id: str, 
         limit: int = 10
-    ) -> List[ConversationData]:
+    ) -> List[ConversationSummary]:
         """
         Get conversation history for a user
         
+        Only summary attributes are read; use get_full_conversation for a complete entry.
+        
         Args:
             user_id: User identifier
             limit: Maximum number of conversation entries to retrieve
             
         Returns:
-            List of conversation data entries
+            List of conversation summaries, latest first
         """
         
         try:
             logger.info(f"Retrieving conversation history for user: {user_id}, limit: {limit}")
             
-            response = self.table.query(
-                KeyConditionExpression=Key('user_id').eq(user_id),
-                ScanIndexForward=False,  # Sort in descending order (latest first)
-                Limit=limit
-            )
-            
-            items = response.get('Items', [])
+            # Project the summary attributes so payloads and message histories never cross the wire
+            query_kwargs = {
+                'KeyConditionExpression': Key('user_id').eq(user_id),
+                'ScanIndexForward': False,  # Sort in descending order (latest first)
+                'ProjectionExpression': 'user_id, sort_key, #state, updated_at, last_itinerary_summary',
+                'ExpressionAttributeNames': {'#state': 'state'},  # reserved word
+                'Limit': limit
+            }
             conversations = []
-            
-            for item in items:
-                conversation_data = self._deserialize_conversation_data(item)
-                conversations.append(conversation_data)
+            while len(conversations) < limit:
+                response = await asyncio.to_thread(self.table.query, **query_kwargs)
+                conversations.extend(self._deserialize_summary_item(item) for item in response.get('Items', []))
+                if 'LastEvaluatedKey' not in response:
+                    break
+                query_kwargs['ExclusiveStartKey'] = response['LastEvaluatedKey']
+                query_kwargs['Limit'] = limit - len(conversations)
             
             logger.info(f"Retrieved {len(conversations)} conversation entries for user: {user_id}")
             
@@ -365,6 +795,31 @@ class DynamoDBRepository:
             logger.error(error_msg)
             raise DynamoDBError(error_msg)
     
+    async def get_full_conversation(self, user_id: str, sort_key: str) -> Optional[ConversationData]:
+        """
+        Get one complete conversation entry, e.g. a version listed by get_conversation_history
+        
+        Args:
+            user_id: User identifier
+            sort_key: Sort key of the entry ('CURRENT' or a snapshot timestamp)
+            
+        Returns:
+            ConversationData if found, None otherwise
+        """
+        
+        try:
+            response = await asyncio.to_thread(
+                self.table.get_item,
+                Key={'user_id': user_id, 'sort_key': sort_key}
+            )
+            item = response.get('Item')
+            return self._deserialize_conversation_data(item) if item else None
+            
+        except ClientError as e:
+            error_msg = f"Failed to retrieve conversation {sort_key} for user {user_id}: {str(e)}"
+            logger.error(error_msg)
+            raise DynamoDBError(error_msg)
+    
     async def delete_conversation(self, user_id: str) -> None:
         """
         Delete all conversation data for a user
@@ -375,31 +830,76 @@ class DynamoDBRepository:
         
         try:
             logger.info(f"Deleting conversation data for user: {user_id}")
+            self._invalidate_conversation(user_id)
             
-            # Get all entries for this user
-            response = self.table.query(
-                KeyConditionExpression=Key('user_id').eq(user_id)
+            # Get the keys of all snapshot and per-turn message entries for this user;
+            # message bodies never cross the wire
+            conversation_keys, message_keys = await asyncio.gather(
+                self._query_partition_keys(self.table, user_id, 'sort_key'),
+                self._query_partition_keys(self.messages_table, user_id, 'turn_seq')
             )
             
-            items = response.get('Items', [])
-            
-            # Delete all entries
-            with self.table.batch_writer() as batch:
-                for item in items:
-                    batch.delete_item(
-                        Key={
-                            'user_id': item['user_id'],
-                            'sort_key': item['sort_key']
-                        }
-                    )
+            # Delete all entries, sending the 25-key BatchWriteItem chunks concurrently
+            conversation_requests = [
+                {'DeleteRequest': {'Key': {'user_id': {'S': user_id}, 'sort_key': {'S': item['sort_key']}}}}
+                for item in conversation_keys
+            ]
+            message_requests = [
+                {'DeleteRequest': {'Key': {'user_id': {'S': user_id}, 'turn_seq': {'N': str(item['turn_seq'])}}}}
+                for item in message_keys
+            ]
+            await asyncio.gather(
+                *(
+                    asyncio.to_thread(self._batch_write_all, conversation_requests[start:start + 25])
+                    for start in range(0, len(conversation_requests), 25)
+                ),
+                *(
+                    asyncio.to_thread(self._batch_write_all, message_requests[start:start + 25], self.messages_table_name)
+                    for start in range(0, len(message_requests), 25)
+                )
+            )
             
-            logger.info(f"Deleted {len(items)} conversation entries for user: {user_id}")
+            logger.info(f"Deleted {len(conversation_keys)} conversation entries and {len(message_keys)} messages for user: {user_id}")
             
         except ClientError as e:
             error_msg = f"Failed to delete conversation for user {user_id}: {str(e)}"
             logger.error(error_msg)
             raise DynamoDBError(error_msg)
     
+    async def _query_partition_keys(self, table: Any, user_id: str, sort_key_name: str) -> List[Dict[str, Any]]:
+        """Return the key attributes of every item in a user's partition of a table"""
+        
+        items = []
+        query_kwargs = {
+            'KeyConditionExpression': Key('user_id').eq(user_id),
+            'ProjectionExpression': f'user_id, {sort_key_name}'
+        }
+        while True:
+            response = await asyncio.to_thread(table.query, **query_kwargs)
+            items.extend(response.get('Items', []))
+            if 'LastEvaluatedKey' not in response:
+                return items
+            query_kwargs['ExclusiveStartKey'] = response['LastEvaluatedKey']
+    
+    def _batch_write_all(self, requests: List[Dict[str, Any]], table_name: Optional[str] = None) -> None:
+        """Send up to 25 write requests to a table (conversations by default), retrying unprocessed items (blocking)"""
+        
+        table_name = table_name or self.table_name
+        request = {table_name: requests}
+        for attempt in range(self.batch_max_attempts):
+            response = self.client.batch_write_item(RequestItems=request)
+            request = response.get('UnprocessedItems')
+            if not request:
+                return
+            # Unprocessed items mean the table is throttling; back off with full jitter before resubmitting
+            if attempt < self.batch_max_attempts - 1:
+                time.sleep(random.uniform(0, self.batch_base_delay * (2 ** attempt)))
+        
+        remaining = sum(len(items) for items in request.values())
+        error_msg = f"{remaining} write requests to {table_name} still unprocessed after {self.batch_max_attempts} attempts"
+        logger.error(error_msg)
+        raise DynamoDBError(error_msg)
+    
     async def health_check(self) -> bool:
         """
         Perform a health check on the DynamoDB connection
@@ -409,8 +909,8 @@ class DynamoDBRepository:
         """
         
         try:
-            # Simple describe table operation
-            self.table.load()
+            # Simple describe table operation (always against DynamoDB itself)
+            await asyncio.to_thread(self.dynamodb.Table(get_settings().dynamodb_table_name).load)
             logger.info("DynamoDB health check passed")
             return True
             
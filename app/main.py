@@ -3,47 +3,125 @@ Main FastAPI application for TazaTicket flight agent
 """
 
 import asyncio
+import os
 from contextlib import asynccontextmanager
-from typing import Optional
+from dataclasses import dataclass, field
+from typing import List, Optional, TYPE_CHECKING
+import httpx
 from fastapi import FastAPI, HTTPException, Request, BackgroundTasks, Form, Header
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import ORJSONResponse
 
-from .config import settings
+from .config import get_settings
 from .utils.logging import setup_logging, get_logger
 from .routers import webhook
+from .models.schemas import TwilioWebhookData
 from .services.travelport import TravelportService
 from .services.openai_io import OpenAIService
 from .services.twilio_client import TwilioClient
 from .services.s3_media import S3MediaService
 from .integrations.dynamodb import DynamoDBRepository
 
+if TYPE_CHECKING:
+    from .agents.graph import FlightAgentGraph
+    from .agents.memory import ConversationMemory, ConversationSummarizer
+
 # Setup logging
-setup_logging(settings.log_level)
+setup_logging(get_settings().log_level)
 logger = get_logger(__name__)
 
-# Global service instances
-services = {}
+
+@dataclass(slots=True)
+class Services:
+    """Shared service instances, built once in the lifespan handler"""
+    http: httpx.AsyncClient
+    openai: OpenAIService
+    travelport: TravelportService
+    twilio: TwilioClient
+    s3: S3MediaService
+    dynamodb: DynamoDBRepository
+    memory: "ConversationMemory"
+    summarizer: "ConversationSummarizer"
+    agent_graph: "FlightAgentGraph"
+    message_queue: "asyncio.Queue[TwilioWebhookData]"
+    message_workers: List[asyncio.Task] = field(default_factory=list)
+
+
+# Global service instances (None until startup completes)
+services: Optional[Services] = None
 
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     """Application lifespan handler"""
     
+    global services
+    
     logger.info("Starting TazaTicket Flight Agent application")
     
     # Initialize services
     try:
-        services["openai"] = OpenAIService()
-        services["travelport"] = TravelportService()
-        services["twilio"] = TwilioClient()
-        services["s3"] = S3MediaService()
-        services["dynamodb"] = DynamoDBRepository()
+        # One pooled HTTP/2 client for OpenAI and Twilio media, kept alive for the process lifetime
+        http_client = httpx.AsyncClient(
+            http2=True,
+            limits=httpx.Limits(max_connections=200, max_keepalive_connections=100),
+            timeout=httpx.Timeout(60.0, connect=5.0)
+        )
+        openai_service = OpenAIService(http_client=http_client)
+        dynamodb_service = DynamoDBRepository()
+        travelport_service = TravelportService()
+        twilio_service = TwilioClient(http_client=http_client)
+        s3_service = S3MediaService()
         # Shared in-memory conversation buffer and summarizer
         from .agents.memory import ConversationMemory, ConversationSummarizer
-        services["memory"] = ConversationMemory(services["dynamodb"], window_size=10)
-        services["summarizer"] = ConversationSummarizer(services["openai"], max_messages=20)
+        memory = ConversationMemory(dynamodb_service, window_size=10)
+        summarizer = ConversationSummarizer(openai_service, max_messages=20)
         
-        logger.info("All services initialized successfully")
+        # The agent graph and its helpers hold no per-request state (users are keyed by
+        # user_id), so one instance serves every message and keeps its caches warm
+        from .services.date_parse import DateParsingService
+        from .services.iata_resolver import IATAResolver
+        from .services.search_strategy import SearchStrategy
+        from .services.formatter import ItineraryFormatter
+        from .agents.graph import FlightAgentGraph
+        date_service = DateParsingService()
+        iata_resolver = IATAResolver(openai_service)
+        agent_graph = FlightAgentGraph(
+            openai_service=openai_service,
+            dynamodb_service=dynamodb_service,
+            twilio_service=twilio_service,
+            s3_service=s3_service,
+            travelport_service=travelport_service,
+            date_service=date_service,
+            iata_resolver=iata_resolver,
+            search_strategy=SearchStrategy(travelport_service, date_service),
+            formatter=ItineraryFormatter(iata_resolver),
+            memory=memory,
+            summarizer=summarizer
+        )
+        
+        services = Services(
+            http=http_client,
+            openai=openai_service,
+            travelport=travelport_service,
+            twilio=twilio_service,
+            s3=s3_service,
+            dynamodb=dynamodb_service,
+            memory=memory,
+            summarizer=summarizer,
+            agent_graph=agent_graph,
+            message_queue=asyncio.Queue(maxsize=get_settings().message_queue_size)
+        )
+        
+        # Fixed pool draining the webhook queue, so slow LLM/Travelport calls are bounded in
+        # number instead of piling up as one background task per message
+        worker_count = get_settings().message_workers or max(16, 2 * (os.cpu_count() or 1))
+        services.message_workers = [
+            asyncio.create_task(webhook.message_worker(services.message_queue, agent_graph, twilio_service))
+            for _ in range(worker_count)
+        ]
+        
+        logger.info(f"All services initialized successfully ({worker_count} message workers)")
         
         # Perform initial health checks
         await perform_startup_health_checks()
@@ -57,48 +135,57 @@ async def lifespan(app: FastAPI):
     # Cleanup
     logger.info("Shutting down TazaTicket Flight Agent application")
     
-    # Close async services
-    if "travelport" in services:
-        try:
-            await services["travelport"].__aexit__(None, None, None)
-        except Exception as e:
-            logger.warning(f"Error closing Travelport service: {str(e)}")
-
-
-async def perform_startup_health_checks():
-    """Perform health checks on startup"""
+    if services is None:
+        return
     
-    logger.info("Performing startup health checks...")
+    # Let queued messages finish (bounded), then stop the workers
+    try:
+        await asyncio.wait_for(services.message_queue.join(), timeout=30.0)
+    except asyncio.TimeoutError:
+        logger.warning(f"Dropping {services.message_queue.qsize()} unprocessed messages at shutdown")
+    for worker in services.message_workers:
+        worker.cancel()
+    await asyncio.gather(*services.message_workers, return_exceptions=True)
     
-    # Check DynamoDB
+    # Flush any snapshot writes still queued behind responses
     try:
-        dynamodb_healthy = await services["dynamodb"].health_check()
-        if dynamodb_healthy:
-            logger.info("✅ DynamoDB connection healthy")
-        else:
-            logger.warning("⚠️  DynamoDB connection unhealthy")
+        await services.memory.drain_pending_writes()
     except Exception as e:
-        logger.warning(f"⚠️  DynamoDB health check failed: {str(e)}")
+        logger.warning(f"Error draining pending conversation writes: {str(e)}")
     
-    # Check S3
+    # Close async services
     try:
-        s3_healthy = await services["s3"].health_check()
-        if s3_healthy:
-            logger.info("✅ S3 connection healthy")
-        else:
-            logger.warning("⚠️  S3 connection unhealthy")
+        await services.travelport.__aexit__(None, None, None)
     except Exception as e:
-        logger.warning(f"⚠️  S3 health check failed: {str(e)}")
+        logger.warning(f"Error closing Travelport service: {str(e)}")
     
-    # Check Twilio
     try:
-        twilio_healthy = await services["twilio"].health_check()
-        if twilio_healthy:
-            logger.info("✅ Twilio connection healthy")
-        else:
-            logger.warning("⚠️  Twilio connection unhealthy")
+        await services.http.aclose()
     except Exception as e:
-        logger.warning(f"⚠️  Twilio health check failed: {str(e)}")
+        logger.warning(f"Error closing shared HTTP client: {str(e)}")
+
+
+async def perform_startup_health_checks():
+    """Perform health checks on startup"""
+    
+    logger.info("Performing startup health checks...")
+    
+    # Run the checks concurrently; startup waits for the slowest rather than the sum
+    names = ("DynamoDB", "S3", "Twilio")
+    results = await asyncio.gather(
+        services.dynamodb.health_check(),
+        services.s3.health_check(),
+        services.twilio.health_check(),
+        return_exceptions=True
+    )
+    
+    for name, result in zip(names, results):
+        if isinstance(result, Exception):
+            logger.warning(f"⚠️  {name} health check failed: {str(result)}")
+        elif result:
+            logger.info(f"✅ {name} connection healthy")
+        else:
+            logger.warning(f"⚠️  {name} connection unhealthy")
     
     logger.info("Startup health checks completed")
 
@@ -108,7 +195,8 @@ app = FastAPI(
     title="TazaTicket Flight Agent",
     description="Production-ready FastAPI + LangGraph flight agent with multilingual WhatsApp support",
     version="1.0.0",
-    lifespan=lifespan
+    lifespan=lifespan,
+    default_response_class=ORJSONResponse  # JSON bodies (health, readiness, status) serialized by orjson
 )
 
 # Add CORS middleware
@@ -173,77 +261,34 @@ async def readiness_check():
         "checks": {}
     }
     
-    all_healthy = True
-    
-    # Check DynamoDB
-    try:
-        if "dynamodb" in services:
-            dynamodb_healthy = await services["dynamodb"].health_check()
-            checks["checks"]["dynamodb"] = "healthy" if dynamodb_healthy else "unhealthy"
-            if not dynamodb_healthy:
-                all_healthy = False
-        else:
-            checks["checks"]["dynamodb"] = "not_initialized"
-            all_healthy = False
-    except Exception as e:
-        checks["checks"]["dynamodb"] = f"error: {str(e)}"
-        all_healthy = False
+    probe_names = ("dynamodb", "s3", "twilio", "travelport", "openai")
     
-    # Check S3
-    try:
-        if "s3" in services:
-            s3_healthy = await services["s3"].health_check()
-            checks["checks"]["s3"] = "healthy" if s3_healthy else "unhealthy"
-            if not s3_healthy:
-                all_healthy = False
-        else:
-            checks["checks"]["s3"] = "not_initialized"
-            all_healthy = False
-    except Exception as e:
-        checks["checks"]["s3"] = f"error: {str(e)}"
-        all_healthy = False
+    if services is None:
+        checks["checks"] = {name: "not_initialized" for name in probe_names}
+        checks["status"] = "degraded"
+        raise HTTPException(status_code=503, detail=checks)
     
-    # Check Twilio
-    try:
-        if "twilio" in services:
-            twilio_healthy = await services["twilio"].health_check()
-            checks["checks"]["twilio"] = "healthy" if twilio_healthy else "unhealthy"
-            if not twilio_healthy:
-                all_healthy = False
-        else:
-            checks["checks"]["twilio"] = "not_initialized"
-            all_healthy = False
-    except Exception as e:
-        checks["checks"]["twilio"] = f"error: {str(e)}"
-        all_healthy = False
+    # Probe every dependency concurrently so one slow check (e.g. a Travelport token refresh)
+    # doesn't delay the others
+    results = await asyncio.gather(
+        services.dynamodb.health_check(),
+        services.s3.health_check(),
+        services.twilio.health_check(),
+        services.travelport._ensure_valid_token(),  # Simple check - try to get a token
+        services.openai.detect_language("hello"),  # Simple language detection test
+        return_exceptions=True
+    )
     
-    # Check Travelport (basic connectivity)
-    try:
-        if "travelport" in services:
-            # Simple check - try to get a token
-            await services["travelport"]._ensure_valid_token()
-            checks["checks"]["travelport"] = "healthy"
-        else:
-            checks["checks"]["travelport"] = "not_initialized"
+    all_healthy = True
+    for name, result in zip(probe_names, results):
+        if isinstance(result, Exception):
+            checks["checks"][name] = f"error: {str(result)}"
             all_healthy = False
-    except Exception as e:
-        checks["checks"]["travelport"] = f"error: {str(e)}"
-        all_healthy = False
-    
-    # Check OpenAI (basic check)
-    try:
-        if "openai" in services:
-            # Simple language detection test
-            test_result = await services["openai"].detect_language("hello")
-            checks["checks"]["openai"] = "healthy" if test_result else "unhealthy"
-            if not test_result:
-                all_healthy = False
+        elif result:
+            checks["checks"][name] = "healthy"
         else:
-            checks["checks"]["openai"] = "not_initialized"
+            checks["checks"][name] = "unhealthy"
             all_healthy = False
-    except Exception as e:
-        checks["checks"]["openai"] = f"error: {str(e)}"
-        all_healthy = False
     
     if not all_healthy:
         checks["status"] = "degraded"
@@ -280,13 +325,14 @@ async def root():
 def get_service(service_name: str):
     """Get service instance by name"""
     
-    if service_name not in services:
+    service = getattr(services, service_name, None) if services is not None else None
+    if service is None:
         raise HTTPException(
             status_code=503, 
             detail=f"Service {service_name} not available"
         )
     
-    return services[service_name]
+    return service
 
 
 # Make services accessible to routers
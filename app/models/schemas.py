@@ -2,7 +2,7 @@
 Pydantic models for data structures used throughout the application
 """
 
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Field, PrivateAttr, model_validator
 from typing import Optional, List, Dict, Any, Literal
 from datetime import datetime
 from enum import Enum
@@ -101,6 +101,9 @@ class Message(BaseModel):
     language: Optional[str] = None
     timestamp: datetime = Field(default_factory=datetime.utcnow)
     media_url: Optional[str] = None  # For voice messages
+    
+    # JSON-mode dump, filled on first save; messages are never mutated after creation
+    _json_cache: Optional[Dict[str, Any]] = PrivateAttr(default=None)
 
 
 class ConversationData(BaseModel):
@@ -120,6 +123,15 @@ class ConversationData(BaseModel):
     updated_at: datetime = Field(default_factory=datetime.utcnow)
 
 
+class ConversationSummary(BaseModel):
+    """Lightweight view of one stored conversation entry, without its messages"""
+    user_id: str
+    sort_key: str
+    state: Optional[ConversationState] = None
+    updated_at: Optional[datetime] = None
+    last_itinerary_summary: Optional[str] = None
+
+
 class TwilioWebhookData(BaseModel):
     """Twilio webhook incoming data"""
     MessageSid: str
@@ -175,6 +187,7 @@ class AgentState(BaseModel):
     """LangGraph agent state"""
     user_id: str
     user_message: str
+    stripped_user_message: str = ""  # user_message.strip(), computed once per turn
     conversation_data: ConversationData
     reformulated_query: Optional[QueryReformulatorOutput] = None
     search_results: Optional[List[Itinerary]] = None
@@ -182,4 +195,13 @@ class AgentState(BaseModel):
     response_audio_url: Optional[str] = None
     should_search: bool = False
     needs_clarification: bool = False
-    clarification_question: Optional[str] = None 
\ No newline at end of file
+    clarification_question: Optional[str] = None
+    current_search_hash: Optional[str] = None
+    
+    @model_validator(mode="before")
+    @classmethod
+    def _strip_user_message(cls, data: Any) -> Any:
+        """Populate stripped_user_message when the caller did not supply it"""
+        if isinstance(data, dict) and "stripped_user_message" not in data and isinstance(data.get("user_message"), str):
+            data = {**data, "stripped_user_message": data["user_message"].strip()}
+        return data
\ No newline at end of file
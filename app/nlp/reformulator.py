@@ -2,10 +2,19 @@
 Query reformulator using GPT-4o-mini for noise-free travel intent extraction
 """
 
-import json
-from typing import Dict, Any, List, Optional
-from datetime import datetime
+import hashlib
+import re
+import time
+from collections import OrderedDict
+from datetime import date, datetime
+from functools import lru_cache
+from typing import Dict, Any, List, Optional, Tuple
 
+import numpy as np
+import orjson
+
+from ..config import get_settings
+from ..services.iata_resolver import CITY_TRIE
 from ..services.openai_io import OpenAIService
 from ..models.schemas import (
     QueryReformulatorInput, 
@@ -19,13 +28,151 @@ from ..utils.errors import ValidationError
 
 logger = get_logger(__name__)
 
+# Static instructions sent as the system message. Kept byte-identical across calls (no
+# f-string, timestamps or per-user content) and above OpenAI's 1024-token minimum so every
+# reformulation hits the prompt prefix cache; the per-turn context goes in the user message.
+_SYSTEM_PROMPT = """You are a travel booking query reformulator. Extract clean, structured travel information from user messages.
+
+You receive the previous conversation, the current booking state, intent analysis hints and the user's latest message. Use the context to resolve references such as "same dates", "there" or "make it two people", but only report values the latest message states or changes.
+
+EXTRACTION RULES:
+1. Extract ONLY explicit travel information from the latest message
+2. For cities: Convert to IATA codes when possible (London=LHR,LGW,STN,LTN,LCY; NYC=JFK,LGA,EWR; etc.); when a city appears under PRE-RESOLVED CITIES, use exactly those codes
+3. For dates: Handle natural language (tomorrow, next Friday, 24th August, September, etc.)
+4. For ranges: Detect "cheapest in [month]" or "between [date1] and [date2]"
+5. For carriers: Extract airline preferences (TK=Turkish Airlines, BA=British Airways, etc.)
+6. Preserve user intent: budget-focused, date-flexible, carrier-specific
+7. Flag ambiguities that need clarification
+
+CITY REFERENCE (multi-airport cities list every commercial airport):
+- London: LHR, LGW, STN, LTN, LCY
+- New York: JFK, LGA, EWR
+- Paris: CDG, ORY
+- Istanbul: IST, SAW
+- Dubai: DXB, DWC
+- Karachi: KHI; Lahore: LHE; Islamabad: ISB
+- Manchester: MAN; Birmingham: BHX; Edinburgh: EDI
+- Jeddah: JED; Riyadh: RUH; Doha: DOH; Abu Dhabi: AUH
+- Toronto: YYZ; Chicago: ORD, MDW; Washington: IAD, DCA, BWI
+Use the city's own name for from_city_name/to_city_name even when codes are returned.
+
+CARRIER REFERENCE:
+TK=Turkish Airlines, BA=British Airways, EK=Emirates, QR=Qatar Airways, EY=Etihad Airways, PK=Pakistan International Airlines, SV=Saudia, VS=Virgin Atlantic, LH=Lufthansa, AF=Air France, KL=KLM.
+
+DATE HANDLING:
+- Resolve relative dates ("tomorrow", "next Friday") to YYYY-MM-DD in "date".
+- A whole month ("in September", "cheapest in October") goes in "month" with its year, not in "date".
+- Spans ("12th-16th August", "between the 3rd and the 9th") go in "date_range" as written.
+- Never move a date into the past; a month already passed this year means next year.
+
+INTENT VALUES:
+- search_specific_date: a concrete travel date is given
+- search_month_range: the user wants the cheapest option within a month
+- search_date_range: the user gives a span of acceptable dates
+- modify_destination / modify_origin / modify_dates / modify_passengers: an existing search is being changed
+- clarify_dates: dates are mentioned but cannot be resolved
+- greeting / general_question / other: no travel details to extract
+
+PASSENGERS AND TRIP TYPE:
+- "me and my wife" is 2 passengers; "family of four" is 4; do not guess when unstated.
+- A return date or words like "return" or "round trip" imply round_trip; "one way" implies one_way.
+
+RESPONSE FORMAT (JSON):
+{
+  "from_city_name": "London" or null,
+  "to_city_name": "Dubai" or null,
+  "from_iata_codes": ["LHR", "LGW", "STN"] or null,
+  "to_iata_codes": ["DXB"] or null,
+  "date": "2025-08-24" or null,
+  "date_range": "12th-16th August" or null,
+  "month": "September 2025" or null,
+  "passengers": 2 or null,
+  "trip_type": "one_way" or "round_trip" or "multi_city" or null,
+  "preferred_carrier": "TK" or null,
+  "intent": "search_specific_date" or "search_month_range" or "modify_destination" or "clarify_dates" etc,
+  "needs_clarification": false,
+  "clarification_question": "What date would you like to travel?" or null,
+  "confidence_level": "high" or "medium" or "low",
+  "price_sensitivity": "budget" or "flexible" or "premium" or null,
+  "flexibility_indicators": ["date_flexible", "airport_flexible"] or []
+}
+
+EXAMPLES:
+- Latest message "cheapest flight from london to dubai in september for 2" with an empty booking state:
+  from_city_name "London", from_iata_codes ["LHR", "LGW", "STN", "LTN", "LCY"], to_city_name "Dubai", to_iata_codes ["DXB"], month "September <year>", passengers 2, intent "search_month_range", price_sensitivity "budget".
+- Latest message "actually make it Istanbul" while the booking state already has London to Dubai:
+  to_city_name "Istanbul", to_iata_codes ["IST", "SAW"], every other field null, intent "modify_destination".
+- Latest message "sometime next month maybe?" with no destination yet:
+  month set to next month, needs_clarification true, clarification_question asking where the user wants to fly, confidence_level "low".
+
+Extract information accurately and flag any ambiguities."""
+
+# Versioned with _SYSTEM_PROMPT so requests share one cache routing key
+_PROMPT_CACHE_KEY = "reformulator-v2"
+
+# One-token check for semantic cache hits that are close but not near-identical
+_VERIFY_PROMPT = (
+    "Do these two travel messages ask for exactly the same cities, dates, passengers and "
+    "preferences? Answer only yes or no."
+)
+
+
+# Single-word date cues, matched against the message's word tokens so "maybe" is not May
+_MONTH_WORDS = frozenset({
+    "january", "february", "march", "april", "may", "june",
+    "july", "august", "september", "october", "november", "december"
+})
+_RELATIVE_DATE_WORDS = frozenset({"tomorrow", "today"})
+_WORD_RE = re.compile(r"[a-z]+")
+
+
+@lru_cache(maxsize=4096)
+def _normalize_message(text: str) -> str:
+    """Case- and whitespace-insensitive form of a user message"""
+    return " ".join(text.lower().split())
+
 
 class QueryReformulator:
     """GPT-4o-mini powered query reformulator for travel intent extraction"""
     
+    # Fallback entity patterns (extract_entities_with_patterns), compiled once per process
+    _CITY_RES = tuple(re.compile(pattern, re.IGNORECASE) for pattern in (
+        r'\bfrom\s+([a-zA-Z\s]+)\s+to\s+([a-zA-Z\s]+)',
+        r'\b([a-zA-Z\s]+)\s+to\s+([a-zA-Z\s]+)',
+        r'\bgoing\s+to\s+([a-zA-Z\s]+)',
+        r'\btravel\s+to\s+([a-zA-Z\s]+)'
+    ))
+    # Every date form in one alternation, so a single finditer pass yields all hits by group name
+    _DATE_RE = re.compile(
+        r'(?P<relative>\btomorrow\b|\btoday\b)'
+        r'|(?P<next>\bnext\s+\w+)'
+        r'|(?P<day_month>\b\d{1,2}(?:st|nd|rd|th)?\s+(?:january|february|march|april|may|june|july|august|september|october|november|december))'
+        r'|(?P<month_day>\b(?:january|february|march|april|may|june|july|august|september|october|november|december)\s+\d{1,2})'
+        r'|(?P<numeric>\d{1,2}[-/]\d{1,2}[-/]\d{2,4})',
+        re.IGNORECASE
+    )
+    
     def __init__(self, openai_service: OpenAIService):
         self.openai_service = openai_service
         
+        # Start with the small model; retry on the larger one only when extraction looks weak
+        self.primary_model = "gpt-4o-mini"
+        self.escalation_model = "gpt-4o"
+        self.escalation_threshold = 0.3
+        self.escalation_min_words = 4
+        
+        # Response cache: exact hits on the normalized message, then (when enabled) semantic hits
+        # on its embedding. Both are scoped to the same history, slots, model and day, since those
+        # change what a message means ("tomorrow", "make it two").
+        self._exact_cache: "OrderedDict[str, Tuple[QueryReformulatorOutput, float]]" = OrderedDict()
+        self._semantic_cache: "OrderedDict[str, List[Tuple[np.ndarray, str, QueryReformulatorOutput, float]]]" = OrderedDict()
+        self.response_cache_size = 2048
+        self.response_cache_ttl = 24 * 60 * 60
+        self.semantic_cache_enabled = get_settings().reformulator_semantic_cache
+        self.semantic_bucket_size = 64
+        self.semantic_hit_threshold = 0.97
+        self.semantic_verify_threshold = 0.85
+        
         # Common travel-related patterns and synonyms
         self.travel_patterns = {
             "trip_types": {
@@ -44,45 +191,166 @@ class QueryReformulator:
                 "flexible": ["any price", "price doesn't matter", "whatever it costs"]
             }
         }
+        self._build_intent_matcher()
     
-    async def reformulate_query(self, input_data: QueryReformulatorInput) -> QueryReformulatorOutput:
+    async def reformulate_query(self, input_data: QueryReformulatorInput, model: Optional[str] = None) -> QueryReformulatorOutput:
         """
         Reformulate user query to extract clean travel intent
         
         Args:
             input_data: Input containing user message, history, and current slots
+            model: OpenAI model to use (defaults to the primary model)
             
         Returns:
             Reformulated query output with extracted travel information
         """
         
+        model = model or self.primary_model
+        context_key = self._context_key(input_data, model)
+        message_key = _normalize_message(input_data.user_message)
+        exact_key = f"{context_key}:{message_key}"
+        
+        cached = self._get_exact(exact_key)
+        if cached is not None:
+            logger.info("Query reformulation served from exact cache")
+            return cached.model_copy(deep=True)
+        
+        embedding = None
+        if self.semantic_cache_enabled:
+            try:
+                embedding = np.asarray(await self.openai_service.create_embedding(message_key), dtype=np.float32)
+                cached = await self._get_semantic(context_key, message_key, embedding)
+            except Exception as e:
+                logger.warning(f"Semantic cache lookup failed: {str(e)}")
+                cached = None
+            if cached is not None:
+                logger.info("Query reformulation served from semantic cache")
+                self._store_exact(exact_key, cached)
+                return cached.model_copy(deep=True)
+        
         try:
             logger.info("Starting query reformulation")
             
-            # Build context-aware prompt
+            # Static instructions first (prefix-cached), per-turn context last
             prompt = self._build_reformulation_prompt(input_data)
             
-            # Call GPT-4o-mini
             response = await self.openai_service.chat_completion(
-                messages=[{"role": "user", "content": prompt}],
-                model="gpt-4o-mini",
+                messages=[
+                    {"role": "system", "content": _SYSTEM_PROMPT},
+                    {"role": "user", "content": prompt}
+                ],
+                model=model,
                 temperature=0.1,  # Low temperature for consistent extraction
-                response_format={"type": "json_object"}
+                response_format={"type": "json_object"},
+                prompt_cache_key=_PROMPT_CACHE_KEY
             )
             
             # Parse and validate response
-            reformulated_data = json.loads(response)
+            reformulated_data = orjson.loads(response)
             output = self._validate_and_structure_output(reformulated_data, input_data)
             
             logger.info(f"Query reformulated successfully: {output.intent}")
-            return output
             
         except Exception as e:
             logger.error(f"Query reformulation failed: {str(e)}")
             return self._create_fallback_output(input_data)
+        
+        # Fallback outputs above are never cached; callers get deep copies since the cached
+        # outputs' IATA code lists end up in users' slots
+        self._store_exact(exact_key, output)
+        if embedding is not None:
+            self._store_semantic(context_key, message_key, embedding, output)
+        return output.model_copy(deep=True)
+    
+    def _context_key(self, input_data: QueryReformulatorInput, model: str) -> str:
+        """Fingerprint of everything besides the message that shapes a reformulation"""
+        
+        history = "\n".join(f"{m.role}:{m.content}" for m in input_data.conversation_history[-3:])
+        raw = f"{model}|{date.today().isoformat()}|{input_data.current_slots.model_dump_json()}|{history}"
+        return hashlib.sha1(raw.encode()).hexdigest()
+    
+    def _get_exact(self, key: str) -> Optional[QueryReformulatorOutput]:
+        """Return an unexpired exact-match output, refreshing its LRU position"""
+        
+        entry = self._exact_cache.get(key)
+        if entry is None:
+            return None
+        if time.monotonic() - entry[1] > self.response_cache_ttl:
+            del self._exact_cache[key]
+            return None
+        self._exact_cache.move_to_end(key)
+        return entry[0]
+    
+    def _store_exact(self, key: str, output: QueryReformulatorOutput) -> None:
+        """Insert an exact-match output, evicting the least recently used entries"""
+        
+        self._exact_cache[key] = (output, time.monotonic())
+        self._exact_cache.move_to_end(key)
+        while len(self._exact_cache) > self.response_cache_size:
+            self._exact_cache.popitem(last=False)
+    
+    async def _get_semantic(
+        self,
+        context_key: str,
+        message_key: str,
+        embedding: np.ndarray
+    ) -> Optional[QueryReformulatorOutput]:
+        """Find a cached output for a similar message in the same context"""
+        
+        bucket = self._semantic_cache.get(context_key)
+        if not bucket:
+            return None
+        now = time.monotonic()
+        bucket[:] = [entry for entry in bucket if now - entry[3] <= self.response_cache_ttl]
+        if not bucket:
+            del self._semantic_cache[context_key]
+            return None
+        self._semantic_cache.move_to_end(context_key)
+        
+        # OpenAI embeddings are unit length, so the dot product is the cosine similarity
+        similarities = np.stack([entry[0] for entry in bucket]) @ embedding
+        best = int(similarities.argmax())
+        similarity = float(similarities[best])
+        _, cached_message, output, _ = bucket[best]
+        
+        if similarity >= self.semantic_hit_threshold:
+            return output
+        if similarity >= self.semantic_verify_threshold and await self._confirm_same_request(message_key, cached_message):
+            return output
+        return None
+    
+    async def _confirm_same_request(self, message: str, cached_message: str) -> bool:
+        """Ask the small model whether two messages carry the same travel request"""
+        
+        answer = await self.openai_service.chat_completion(
+            messages=[
+                {"role": "system", "content": _VERIFY_PROMPT},
+                {"role": "user", "content": f"1: {message}\n2: {cached_message}"}
+            ],
+            model=self.primary_model,
+            temperature=0,
+            max_tokens=1
+        )
+        return answer.strip().lower().startswith("yes")
+    
+    def _store_semantic(
+        self,
+        context_key: str,
+        message_key: str,
+        embedding: np.ndarray,
+        output: QueryReformulatorOutput
+    ) -> None:
+        """Add an output to its context's bucket, bounding bucket and context counts"""
+        
+        bucket = self._semantic_cache.setdefault(context_key, [])
+        bucket.append((embedding, message_key, output, time.monotonic()))
+        del bucket[:-self.semantic_bucket_size]
+        self._semantic_cache.move_to_end(context_key)
+        while len(self._semantic_cache) > self.response_cache_size:
+            self._semantic_cache.popitem(last=False)
     
     def _build_reformulation_prompt(self, input_data: QueryReformulatorInput) -> str:
-        """Build the reformulation prompt for GPT-4o-mini"""
+        """Build the per-turn user message; the static instructions live in _SYSTEM_PROMPT"""
         
         # Get conversation context
         history_context = self._format_conversation_history(input_data.conversation_history[-3:])
@@ -93,50 +361,28 @@ class QueryReformulator:
         # Detect user intent patterns
         intent_hints = self._detect_intent_patterns(input_data.user_message)
         
-        prompt = f"""You are a travel booking query reformulator. Extract clean, structured travel information from user messages.
-
-CONTEXT:
+        # Cities the local dictionary already knows, so the model copies codes instead of recalling them
+        known_cities = CITY_TRIE.find_cities(input_data.user_message)
+        resolved_context = "\n".join(
+            f"{name.title()}: {', '.join(codes)}" for name, codes in known_cities.items()
+        ) or "None"
+        
+        prompt = f"""CONTEXT:
 Previous conversation:
 {history_context}
 
 Current booking state:
 {slots_context}
 
-USER'S LATEST MESSAGE: "{input_data.user_message}"
-
 INTENT ANALYSIS HINTS:
 {intent_hints}
 
-EXTRACTION RULES:
-1. Extract ONLY explicit travel information from the latest message
-2. For cities: Convert to IATA codes when possible (London=LHR,LGW,STN,LTN,LCY; NYC=JFK,LGA,EWR; etc.)
-3. For dates: Handle natural language (tomorrow, next Friday, 24th August, September, etc.)
-4. For ranges: Detect "cheapest in [month]" or "between [date1] and [date2]"
-5. For carriers: Extract airline preferences (TK=Turkish Airlines, BA=British Airways, etc.)
-6. Preserve user intent: budget-focused, date-flexible, carrier-specific
-7. Flag ambiguities that need clarification
+PRE-RESOLVED CITIES:
+{resolved_context}
 
-RESPONSE FORMAT (JSON):
-{{
-  "from_city_name": "London" or null,
-  "to_city_name": "Dubai" or null,
-  "from_iata_codes": ["LHR", "LGW", "STN"] or null,
-  "to_iata_codes": ["DXB"] or null,
-  "date": "2025-08-24" or null,
-  "date_range": "12th-16th August" or null,
-  "month": "September 2025" or null,
-  "passengers": 2 or null,
-  "trip_type": "one_way" or "round_trip" or "multi_city" or null,
-  "preferred_carrier": "TK" or null,
-  "intent": "search_specific_date" or "search_month_range" or "modify_destination" or "clarify_dates" etc,
-  "needs_clarification": false,
-  "clarification_question": "What date would you like to travel?" or null,
-  "confidence_level": "high" or "medium" or "low",
-  "price_sensitivity": "budget" or "flexible" or "premium" or null,
-  "flexibility_indicators": ["date_flexible", "airport_flexible"] or []
-}}
+USER'S LATEST MESSAGE: "{input_data.user_message}"
 
-Extract information accurately and flag any ambiguities:"""
+Extract the travel information as JSON:"""
         
         return prompt
     
@@ -166,36 +412,60 @@ Trip Type: {slots.trip_type or 'Not specified'}
 Preferred Carrier: {slots.preferred_carrier or 'No preference'}
 Search Type: {slots.date_search_type or 'exact'}"""
     
+    def _build_intent_matcher(self) -> None:
+        """Compile every intent keyword into one alternation mapped to its hint labels"""
+        
+        # Hint labels in output order, each with the keywords that trigger it
+        labeled_keywords = [
+            (f"Trip type: {trip_type}", patterns)
+            for trip_type, patterns in self.travel_patterns["trip_types"].items()
+        ] + [
+            (f"Date preference: {date_type}", patterns)
+            for date_type, patterns in self.travel_patterns["date_indicators"].items()
+        ] + [
+            (f"Price sensitivity: {price_type}", patterns)
+            for price_type, patterns in self.travel_patterns["price_sensitivity"].items()
+        ] + [
+            ("Intent: Find cheapest option", ["cheapest", "best price", "lowest fare"]),
+            ("Date type: Relative date", ["next week"]),  # single words via _RELATIVE_DATE_WORDS
+            ("Date type: Monthly search", [])  # via _MONTH_WORDS
+        ]
+        self._intent_labels = tuple(label for label, _ in labeled_keywords)
+        # Word sets checked against the tokenized message, with the label index each one sets
+        self._intent_token_labels = (
+            (_RELATIVE_DATE_WORDS, self._intent_labels.index("Date type: Relative date")),
+            (_MONTH_WORDS, self._intent_labels.index("Date type: Monthly search"))
+        )
+        
+        keyword_labels: Dict[str, set] = {}
+        for index, (_, patterns) in enumerate(labeled_keywords):
+            for pattern in patterns:
+                keyword_labels.setdefault(pattern, set()).add(index)
+        # A match consumes its text, so a keyword also carries the labels of keywords it
+        # contains ("cheapest" is budget as well), keeping plain substring semantics
+        self._intent_keyword_labels = {
+            keyword: frozenset().union(*(labels for other, labels in keyword_labels.items() if other in keyword))
+            for keyword in keyword_labels
+        }
+        # Longest first so the alternation prefers the most specific keyword at each position
+        self._intent_re = re.compile("|".join(
+            re.escape(keyword) for keyword in sorted(keyword_labels, key=len, reverse=True)
+        ))
+    
     def _detect_intent_patterns(self, user_message: str) -> str:
         """Detect intent patterns in user message"""
         
         message_lower = user_message.lower()
-        detected_patterns = []
-        
-        # Check for trip type patterns
-        for trip_type, patterns in self.travel_patterns["trip_types"].items():
-            if any(pattern in message_lower for pattern in patterns):
-                detected_patterns.append(f"Trip type: {trip_type}")
-        
-        # Check for date patterns
-        for date_type, patterns in self.travel_patterns["date_indicators"].items():
-            if any(pattern in message_lower for pattern in patterns):
-                detected_patterns.append(f"Date preference: {date_type}")
-        
-        # Check for price sensitivity
-        for price_type, patterns in self.travel_patterns["price_sensitivity"].items():
-            if any(pattern in message_lower for pattern in patterns):
-                detected_patterns.append(f"Price sensitivity: {price_type}")
-        
-        # Check for specific patterns
-        if any(word in message_lower for word in ["cheapest", "best price", "lowest fare"]):
-            detected_patterns.append("Intent: Find cheapest option")
         
-        if any(word in message_lower for word in ["tomorrow", "today", "next week"]):
-            detected_patterns.append("Date type: Relative date")
-        
-        if any(word in message_lower for word in ["september", "october", "november", "december", "january", "february", "march", "april", "may", "june", "july", "august"]):
-            detected_patterns.append("Date type: Monthly search")
+        # One left-to-right scan for every keyword instead of a substring pass per keyword
+        hits = set()
+        for keyword in self._intent_re.findall(message_lower):
+            hits |= self._intent_keyword_labels[keyword]
+        tokens = set(_WORD_RE.findall(message_lower))
+        for words, index in self._intent_token_labels:
+            if not words.isdisjoint(tokens):
+                hits.add(index)
+        detected_patterns = [self._intent_labels[index] for index in sorted(hits)]
         
         if "between" in message_lower and "and" in message_lower:
             detected_patterns.append("Date type: Range search")
@@ -288,26 +558,8 @@ Search Type: {slots.date_search_type or 'exact'}"""
         text_lower = text.lower()
         entities = {}
         
-        # Simple city extraction patterns
-        city_patterns = [
-            r'\bfrom\s+([a-zA-Z\s]+)\s+to\s+([a-zA-Z\s]+)',
-            r'\b([a-zA-Z\s]+)\s+to\s+([a-zA-Z\s]+)',
-            r'\bgoing\s+to\s+([a-zA-Z\s]+)',
-            r'\btravel\s+to\s+([a-zA-Z\s]+)'
-        ]
-        
-        # Date extraction patterns
-        date_patterns = [
-            r'\btomorrow\b',
-            r'\btoday\b',
-            r'\bnext\s+\w+',
-            r'\b\d{1,2}(st|nd|rd|th)?\s+(january|february|march|april|may|june|july|august|september|october|november|december)',
-            r'\b(january|february|march|april|may|june|july|august|september|october|november|december)\s+\d{1,2}',
-            r'\d{1,2}[-/]\d{1,2}[-/]\d{2,4}'
-        ]
-        
-        # This would contain actual regex matching logic
-        # For now, return empty dict as this is a fallback
+        # Matching would run _CITY_RES in order and one _DATE_RE.finditer(text_lower) pass,
+        # bucketing hits by group name; for now, return empty dict as this is a fallback
         
         return entities
     
@@ -352,6 +604,14 @@ Search Type: {slots.date_search_type or 'exact'}"""
         output = await self.reformulate_query(input_data)
         confidence = self.get_reformulation_confidence(output, input_data)
         
+        # Short messages ("hi", "yes") are legitimately low-information; only escalate substantive ones
+        if confidence < self.escalation_threshold and len(input_data.user_message.split()) >= self.escalation_min_words:
+            logger.info(f"Low reformulation confidence ({confidence:.2f}), escalating to {self.escalation_model}")
+            escalated = await self.reformulate_query(input_data, model=self.escalation_model)
+            escalated_confidence = self.get_reformulation_confidence(escalated, input_data)
+            if escalated_confidence > confidence:
+                output, confidence = escalated, escalated_confidence
+        
         # Adjust output based on confidence
         if confidence < 0.3:
             output.needs_clarification = True
@@ -3,14 +3,18 @@ WhatsApp webhook router for handling incoming messages
 """
 
 import asyncio
-from typing import Optional
+from typing import Optional, TYPE_CHECKING
 from fastapi import APIRouter, Form, Request, BackgroundTasks, HTTPException, Header
 from fastapi.responses import PlainTextResponse
 
 from ..models.schemas import TwilioWebhookData, Message, MessageModality
+from ..services.twilio_client import TwilioClient
 from ..utils.logging import get_logger, LogContext
 from ..utils.errors import TazaTicketError
 
+if TYPE_CHECKING:
+    from ..agents.graph import FlightAgentGraph
+
 logger = get_logger(__name__)
 
 router = APIRouter()
@@ -158,15 +162,6 @@ async def process_webhook_request(
             else:
                 logger.info("Webhook signature validation skipped for testing")
             
-            # Send immediate acknowledgment
-            ack_message = "We're on it! 🚀"
-            try:
-                await twilio_service.send_acknowledgment(From, ack_message)
-                logger.info("Sent acknowledgment message")
-            except Exception as e:
-                logger.warning(f"Failed to send acknowledgment: {str(e)}")
-                # Continue processing even if ack fails
-            
             # Create webhook data
             webhook_data = TwilioWebhookData(
                 MessageSid=MessageSid,
@@ -179,12 +174,22 @@ async def process_webhook_request(
                 NumMedia=NumMedia
             )
             
-            # Schedule async processing
-            background_tasks.add_task(
-                process_message_async, 
-                webhook_data, 
-                request.app.state.get_service
-            )
+            # Queue for the worker pool (see message_worker); when it is full, refuse with 503
+            # so Twilio retries later instead of the event loop taking on unbounded work
+            try:
+                request.app.state.get_service("message_queue").put_nowait(webhook_data)
+            except asyncio.QueueFull:
+                logger.warning("Message queue full, rejecting webhook")
+                raise HTTPException(status_code=503, detail="Server busy, retry later")
+            
+            # Send immediate acknowledgment (only once the message is accepted)
+            ack_message = "We're on it! 🚀"
+            try:
+                await twilio_service.send_acknowledgment(From, ack_message)
+                logger.info("Sent acknowledgment message")
+            except Exception as e:
+                logger.warning(f"Failed to send acknowledgment: {str(e)}")
+                # Continue processing even if ack fails
             
             logger.info("Message processing scheduled")
             
@@ -232,9 +237,32 @@ async def whatsapp_webhook(
     )
 
 
-async def process_message_async(webhook_data: TwilioWebhookData, get_service_func):
+async def message_worker(
+    queue: "asyncio.Queue[TwilioWebhookData]",
+    agent_graph: "FlightAgentGraph",
+    twilio_service: TwilioClient
+) -> None:
+    """Process queued webhook messages one at a time until cancelled"""
+    
+    while True:
+        webhook_data = await queue.get()
+        try:
+            await process_message_async(webhook_data, agent_graph, twilio_service)
+        except Exception as e:
+            logger.error(f"Message worker error: {str(e)}")
+        finally:
+            queue.task_done()
+
+
+async def process_message_async(
+    webhook_data: TwilioWebhookData,
+    agent_graph: "FlightAgentGraph",
+    twilio_service: TwilioClient
+):
     """
     Asynchronously process the incoming WhatsApp message
+    
+    The agent graph is the process-wide instance built at startup; per-user state is keyed by user_id
     """
     
     user_id = webhook_data.From
@@ -243,39 +271,7 @@ async def process_message_async(webhook_data: TwilioWebhookData, get_service_fun
         try:
             logger.info("Starting async message processing")
             
-            # Get services
-            openai_service = get_service_func("openai")
-            dynamodb_service = get_service_func("dynamodb")
-            twilio_service = get_service_func("twilio")
-            s3_service = get_service_func("s3")
-            
-            # Initialize additional services
-            from ..services.date_parse import DateParsingService
-            from ..services.iata_resolver import IATAResolver
-            from ..services.search_strategy import SearchStrategy
-            from ..services.formatter import ItineraryFormatter
-            from ..agents.graph import FlightAgentGraph
-            
-            date_service = DateParsingService()
-            iata_resolver = IATAResolver(openai_service)
-            travelport_service = get_service_func("travelport")
-            search_strategy = SearchStrategy(travelport_service, date_service)
-            formatter = ItineraryFormatter(iata_resolver)
-            
-            # Create agent graph
-            agent_graph = FlightAgentGraph(
-                openai_service=openai_service,
-                dynamodb_service=dynamodb_service,
-                twilio_service=twilio_service,
-                s3_service=s3_service,
-                travelport_service=travelport_service,
-                date_service=date_service,
-                iata_resolver=iata_resolver,
-                search_strategy=search_strategy,
-                formatter=formatter,
-                memory=get_service_func("memory"),
-                summarizer=get_service_func("summarizer")
-            )
+            openai_service = agent_graph.openai_service
             
             # Determine message content and modality
             user_message_content = ""
@@ -296,6 +292,10 @@ async def process_message_async(webhook_data: TwilioWebhookData, get_service_fun
                     
                     logger.info("Processing voice message")
                     
+                    # Load the conversation while the audio is downloaded and transcribed, so the
+                    # agent starts from a warm cache instead of paying the DynamoDB read afterwards
+                    prefetch_task = asyncio.create_task(agent_graph.memory.get_or_create_conversation(user_id))
+                    
                     # Download and transcribe audio
                     try:
                         audio_data = await twilio_service.download_media(webhook_data.MediaUrl0)
@@ -310,6 +310,13 @@ async def process_message_async(webhook_data: TwilioWebhookData, get_service_fun
                         logger.error(f"Failed to process voice message: {str(e)}")
                         user_message_content = "Sorry, I couldn't understand the voice message. Please try again or send a text message."
                         message_modality = MessageModality.TEXT
+                    
+                    # Settle the prefetch before the agent touches the same cached state; on
+                    # failure the agent simply loads the conversation itself
+                    try:
+                        await prefetch_task
+                    except Exception as e:
+                        logger.warning(f"Conversation prefetch failed: {str(e)}")
                 else:
                     logger.warning(f"Unsupported media type: {webhook_data.MediaContentType0}")
                     user_message_content = "Sorry, I can only process text and voice messages."
@@ -358,7 +365,6 @@ async def process_message_async(webhook_data: TwilioWebhookData, get_service_fun
             
             # Try to send a generic error message
             try:
-                twilio_service = get_service_func("twilio")
                 error_message = "Sorry, something went wrong. Please try again later."
                 await twilio_service.send_text_message(user_id, error_message)
             except:
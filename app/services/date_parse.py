@@ -9,7 +9,7 @@ import pytz
 from dateutil import parser
 from dateutil.relativedelta import relativedelta
 
-from ..config import settings
+from ..config import get_settings
 from ..utils.errors import DateParsingError
 from ..utils.logging import get_logger
 
@@ -20,7 +20,7 @@ class DateParsingService:
     """Service for parsing natural language dates and date ranges"""
     
     def __init__(self):
-        self.timezone = pytz.timezone(settings.app_timezone)
+        self.timezone = pytz.timezone(get_settings().app_timezone)
         self.utc = pytz.UTC
         
         # Month name mappings (English and common variations)
@@ -2,7 +2,7 @@
 IATA code resolver with LLM assistance and fallback mapping for major cities
 """
 
-from typing import List, Optional, Dict
+from typing import Any, List, Optional, Dict
 import asyncio
 
 from ..services.openai_io import OpenAIService
@@ -11,6 +11,255 @@ from ..utils.logging import get_logger
 
 logger = get_logger(__name__)
 
+# Major cities with multiple airports (metro areas)
+_MULTI_AIRPORT_CITIES: Dict[str, List[str]] = {
+    # Major hubs with multiple airports
+    "london": ["LHR", "LGW", "STN", "LTN", "LCY", "SEN"],
+    "new york": ["JFK", "LGA", "EWR"],
+    "paris": ["CDG", "ORY", "BVA"],
+    "tokyo": ["NRT", "HND"],
+    "milan": ["MXP", "LIN", "BGY"],
+    "rome": ["FCO", "CIA"],
+    "istanbul": ["IST", "SAW"],
+    "moscow": ["SVO", "DME", "VKO"],
+    "bangkok": ["BKK", "DMK"],
+    "chicago": ["ORD", "MDW"],
+    "los angeles": ["LAX", "BUR", "LGB", "SNA"],
+    "washington": ["DCA", "IAD", "BWI"],
+    "berlin": ["BER", "SXF"],
+    "buenos aires": ["EZE", "AEP"],
+    "rio de janeiro": ["GIG", "SDU"],
+    "sao paulo": ["GRU", "CGH", "VCP"],
+    "shanghai": ["PVG", "SHA"],
+    "beijing": ["PEK", "PKX"],
+    "osaka": ["KIX", "ITM"],
+    "stockholm": ["ARN", "BMA", "NYO"],
+    "montreal": ["YUL", "YMX"],
+    "houston": ["IAH", "HOU"],
+    "miami": ["MIA", "FLL", "PBI"],
+    "dubai": ["DXB", "DWC"],
+    "tehran": ["IKA", "THR"],
+}
+
+# Single-airport cities (major destinations)
+_SINGLE_AIRPORT_CITIES: Dict[str, List[str]] = {
+    # Europe
+    "madrid": ["MAD"],
+    "barcelona": ["BCN"],
+    "amsterdam": ["AMS"],
+    "frankfurt": ["FRA"],
+    "munich": ["MUC"],
+    "zurich": ["ZUR"],
+    "vienna": ["VIE"],
+    "copenhagen": ["CPH"],
+    "oslo": ["OSL"],
+    "helsinki": ["HEL"],
+    "dublin": ["DUB"],
+    "edinburgh": ["EDI"],
+    "manchester": ["MAN"],
+    "brussels": ["BRU"],
+    "lisbon": ["LIS"],
+    "athens": ["ATH"],
+    "warsaw": ["WAW"],
+    "prague": ["PRG"],
+    "budapest": ["BUD"],
+    "bucharest": ["OTP"],
+    "sofia": ["SOF"],
+    "zagreb": ["ZAG"],
+    "belgrade": ["BEG"],
+    "kiev": ["KBP"],
+    "minsk": ["MSQ"],
+    "riga": ["RIX"],
+    "tallinn": ["TLL"],
+    "vilnius": ["VNO"],
+
+    # Middle East & Central Asia
+    "doha": ["DOH"],
+    "kuwait": ["KWI"],
+    "riyadh": ["RUH"],
+    "jeddah": ["JED"],
+    "muscat": ["MCT"],
+    "abu dhabi": ["AUH"],
+    "sharjah": ["SHJ"],
+    "cairo": ["CAI"],
+    "casablanca": ["CMN"],
+    "tunis": ["TUN"],
+    "algiers": ["ALG"],
+    "baku": ["GYD"],
+    "yerevan": ["EVN"],
+    "tbilisi": ["TBS"],
+    "almaty": ["ALA"],
+    "tashkent": ["TAS"],
+    "ashgabat": ["ASB"],
+
+    # Asia
+    "delhi": ["DEL"],
+    "mumbai": ["BOM"],
+    "chennai": ["MAA"],
+    "bangalore": ["BLR"],
+    "hyderabad": ["HYD"],
+    "kolkata": ["CCU"],
+    "ahmedabad": ["AMD"],
+    "pune": ["PNQ"],
+    "cochin": ["COK"],
+    "goa": ["GOI"],
+    "singapore": ["SIN"],
+    "kuala lumpur": ["KUL"],
+    "jakarta": ["CGK"],
+    "manila": ["MNL"],
+    "cebu": ["CEB"],
+    "ho chi minh": ["SGN"],
+    "hanoi": ["HAN"],
+    "phnom penh": ["PNH"],
+    "yangon": ["RGN"],
+    "dhaka": ["DAC"],
+    "karachi": ["KHI"],
+    "lahore": ["LHE"],
+    "islamabad": ["ISB"],
+    "peshawar": ["PEW"],
+    "faisalabad": ["LYP"],
+    "multan": ["MUX"],
+    "sialkot": ["SKT"],
+    "quetta": ["UET"],
+    "colombo": ["CMB"],
+    "male": ["MLE"],
+    "kathmandu": ["KTM"],
+    "kabul": ["KBL"],
+    "seoul": ["ICN"],
+    "busan": ["PUS"],
+    "hong kong": ["HKG"],
+    "macau": ["MFM"],
+    "taipei": ["TPE"],
+    "kaohsiung": ["KHH"],
+
+    # Africa
+    "johannesburg": ["JNB"],
+    "cape town": ["CPT"],
+    "durban": ["DUR"],
+    "lagos": ["LOS"],
+    "abuja": ["ABV"],
+    "nairobi": ["NBO"],
+    "addis ababa": ["ADD"],
+    "khartoum": ["KRT"],
+    "accra": ["ACC"],
+    "dakar": ["DKR"],
+    "bamako": ["BKO"],
+    "ouagadougou": ["OUA"],
+    "abidjan": ["ABJ"],
+    "douala": ["DLA"],
+    "libreville": ["LBV"],
+    "kinshasa": ["FIH"],
+    "luanda": ["LAD"],
+    "maputo": ["MPM"],
+    "antananarivo": ["TNR"],
+    "mauritius": ["MRU"],
+
+    # Americas
+    "toronto": ["YYZ"],
+    "vancouver": ["YVR"],
+    "calgary": ["YYC"],
+    "ottawa": ["YOW"],
+    "mexico city": ["MEX"],
+    "cancun": ["CUN"],
+    "guadalajara": ["GDL"],
+    "tijuana": ["TIJ"],
+    "bogota": ["BOG"],
+    "medellin": ["MDE"],
+    "lima": ["LIM"],
+    "quito": ["UIO"],
+    "guayaquil": ["GYE"],
+    "caracas": ["CCS"],
+    "la paz": ["LPB"],
+    "santa cruz": ["VVI"],
+    "asuncion": ["ASU"],
+    "montevideo": ["MVD"],
+    "santiago": ["SCL"],
+    "san francisco": ["SFO"],
+    "san diego": ["SAN"],
+    "las vegas": ["LAS"],
+    "phoenix": ["PHX"],
+    "denver": ["DEN"],
+    "atlanta": ["ATL"],
+    "orlando": ["MCO"],
+    "tampa": ["TPA"],
+    "charlotte": ["CLT"],
+    "nashville": ["BNA"],
+    "new orleans": ["MSY"],
+    "dallas": ["DFW"],
+    "austin": ["AUS"],
+    "san antonio": ["SAT"],
+    "seattle": ["SEA"],
+    "portland": ["PDX"],
+    "salt lake city": ["SLC"],
+    "minneapolis": ["MSP"],
+    "detroit": ["DTW"],
+    "cleveland": ["CLE"],
+    "pittsburgh": ["PIT"],
+    "philadelphia": ["PHL"],
+    "boston": ["BOS"],
+
+    # Oceania
+    "sydney": ["SYD"],
+    "melbourne": ["MEL"],
+    "brisbane": ["BNE"],
+    "perth": ["PER"],
+    "adelaide": ["ADL"],
+    "auckland": ["AKL"],
+    "wellington": ["WLG"],
+    "christchurch": ["CHC"],
+    "suva": ["SUV"],
+    "port moresby": ["POM"],
+}
+
+# Combine all cities for easy lookup
+_ALL_CITIES: Dict[str, List[str]] = {**_MULTI_AIRPORT_CITIES, **_SINGLE_AIRPORT_CITIES}
+
+
+class CityTrie:
+    """Character trie over lowercased city names for longest-match scans of free text"""
+    
+    __slots__ = ("_root",)
+    
+    def __init__(self, cities: Dict[str, List[str]]):
+        # Nested dicts keyed by character; the None key marks the end of a city name
+        self._root: Dict[Any, Any] = {}
+        for name, codes in cities.items():
+            node = self._root
+            for char in name:
+                node = node.setdefault(char, {})
+            node[None] = (name, codes)
+    
+    def find_cities(self, text: str) -> Dict[str, List[str]]:
+        """Map every city named in text to its IATA codes, taking the longest name at each word"""
+        
+        text = text.lower()
+        length = len(text)
+        found: Dict[str, List[str]] = {}
+        position = 0
+        while position < length:
+            # Names only start at word boundaries ("rome" must not match inside "jerome")
+            if position and text[position - 1].isalnum():
+                position += 1
+                continue
+            node = self._root
+            match = None
+            cursor = position
+            while cursor < length and text[cursor] in node:
+                node = node[text[cursor]]
+                cursor += 1
+                if None in node and (cursor == length or not text[cursor].isalnum()):
+                    match = (node[None], cursor)
+            if match is None:
+                position += 1
+                continue
+            (name, codes), position = match
+            found[name] = codes
+        return found
+
+
+# Built once at import; lookups cost O(message length), with no model round-trip
+CITY_TRIE = CityTrie(_ALL_CITIES)
+
 
 class IATAResolver:
     """Service for resolving city names to IATA airport codes"""
@@ -18,208 +267,10 @@ class IATAResolver:
     def __init__(self, openai_service: OpenAIService):
         self.openai_service = openai_service
         
-        # Major cities with multiple airports (metro areas)
-        self.multi_airport_cities = {
-            # Major hubs with multiple airports
-            "london": ["LHR", "LGW", "STN", "LTN", "LCY", "SEN"],
-            "new york": ["JFK", "LGA", "EWR"],
-            "paris": ["CDG", "ORY", "BVA"],
-            "tokyo": ["NRT", "HND"],
-            "milan": ["MXP", "LIN", "BGY"],
-            "rome": ["FCO", "CIA"],
-            "istanbul": ["IST", "SAW"],
-            "moscow": ["SVO", "DME", "VKO"],
-            "bangkok": ["BKK", "DMK"],
-            "chicago": ["ORD", "MDW"],
-            "los angeles": ["LAX", "BUR", "LGB", "SNA"],
-            "washington": ["DCA", "IAD", "BWI"],
-            "berlin": ["BER", "SXF"],
-            "buenos aires": ["EZE", "AEP"],
-            "rio de janeiro": ["GIG", "SDU"],
-            "sao paulo": ["GRU", "CGH", "VCP"],
-            "shanghai": ["PVG", "SHA"],
-            "beijing": ["PEK", "PKX"],
-            "osaka": ["KIX", "ITM"],
-            "stockholm": ["ARN", "BMA", "NYO"],
-            "montreal": ["YUL", "YMX"],
-            "houston": ["IAH", "HOU"],
-            "miami": ["MIA", "FLL", "PBI"],
-            "dubai": ["DXB", "DWC"],
-            "tehran": ["IKA", "THR"],
-        }
-        
-        # Single-airport cities (major destinations)
-        self.single_airport_cities = {
-            # Europe
-            "madrid": ["MAD"],
-            "barcelona": ["BCN"],
-            "amsterdam": ["AMS"],
-            "frankfurt": ["FRA"],
-            "munich": ["MUC"],
-            "zurich": ["ZUR"],
-            "vienna": ["VIE"],
-            "copenhagen": ["CPH"],
-            "oslo": ["OSL"],
-            "helsinki": ["HEL"],
-            "dublin": ["DUB"],
-            "edinburgh": ["EDI"],
-            "manchester": ["MAN"],
-            "brussels": ["BRU"],
-            "lisbon": ["LIS"],
-            "athens": ["ATH"],
-            "warsaw": ["WAW"],
-            "prague": ["PRG"],
-            "budapest": ["BUD"],
-            "bucharest": ["OTP"],
-            "sofia": ["SOF"],
-            "zagreb": ["ZAG"],
-            "belgrade": ["BEG"],
-            "kiev": ["KBP"],
-            "minsk": ["MSQ"],
-            "riga": ["RIX"],
-            "tallinn": ["TLL"],
-            "vilnius": ["VNO"],
-            
-            # Middle East & Central Asia
-            "doha": ["DOH"],
-            "kuwait": ["KWI"],
-            "riyadh": ["RUH"],
-            "jeddah": ["JED"],
-            "muscat": ["MCT"],
-            "abu dhabi": ["AUH"],
-            "sharjah": ["SHJ"],
-            "cairo": ["CAI"],
-            "casablanca": ["CMN"],
-            "tunis": ["TUN"],
-            "algiers": ["ALG"],
-            "baku": ["GYD"],
-            "yerevan": ["EVN"],
-            "tbilisi": ["TBS"],
-            "almaty": ["ALA"],
-            "tashkent": ["TAS"],
-            "ashgabat": ["ASB"],
-            
-            # Asia
-            "delhi": ["DEL"],
-            "mumbai": ["BOM"],
-            "chennai": ["MAA"],
-            "bangalore": ["BLR"],
-            "hyderabad": ["HYD"],
-            "kolkata": ["CCU"],
-            "ahmedabad": ["AMD"],
-            "pune": ["PNQ"],
-            "cochin": ["COK"],
-            "goa": ["GOI"],
-            "singapore": ["SIN"],
-            "kuala lumpur": ["KUL"],
-            "jakarta": ["CGK"],
-            "manila": ["MNL"],
-            "cebu": ["CEB"],
-            "ho chi minh": ["SGN"],
-            "hanoi": ["HAN"],
-            "phnom penh": ["PNH"],
-            "yangon": ["RGN"],
-            "dhaka": ["DAC"],
-            "karachi": ["KHI"],
-            "lahore": ["LHE"],
-            "islamabad": ["ISB"],
-            "peshawar": ["PEW"],
-            "faisalabad": ["LYP"],
-            "multan": ["MUX"],
-            "sialkot": ["SKT"],
-            "quetta": ["UET"],
-            "colombo": ["CMB"],
-            "male": ["MLE"],
-            "kathmandu": ["KTM"],
-            "kabul": ["KBL"],
-            "seoul": ["ICN"],
-            "busan": ["PUS"],
-            "hong kong": ["HKG"],
-            "macau": ["MFM"],
-            "taipei": ["TPE"],
-            "kaohsiung": ["KHH"],
-            
-            # Africa
-            "johannesburg": ["JNB"],
-            "cape town": ["CPT"],
-            "durban": ["DUR"],
-            "lagos": ["LOS"],
-            "abuja": ["ABV"],
-            "nairobi": ["NBO"],
-            "addis ababa": ["ADD"],
-            "khartoum": ["KRT"],
-            "accra": ["ACC"],
-            "dakar": ["DKR"],
-            "bamako": ["BKO"],
-            "ouagadougou": ["OUA"],
-            "abidjan": ["ABJ"],
-            "douala": ["DLA"],
-            "libreville": ["LBV"],
-            "kinshasa": ["FIH"],
-            "luanda": ["LAD"],
-            "maputo": ["MPM"],
-            "antananarivo": ["TNR"],
-            "mauritius": ["MRU"],
-            
-            # Americas
-            "toronto": ["YYZ"],
-            "vancouver": ["YVR"],
-            "calgary": ["YYC"],
-            "ottawa": ["YOW"],
-            "mexico city": ["MEX"],
-            "cancun": ["CUN"],
-            "guadalajara": ["GDL"],
-            "tijuana": ["TIJ"],
-            "bogota": ["BOG"],
-            "medellin": ["MDE"],
-            "lima": ["LIM"],
-            "quito": ["UIO"],
-            "guayaquil": ["GYE"],
-            "caracas": ["CCS"],
-            "la paz": ["LPB"],
-            "santa cruz": ["VVI"],
-            "asuncion": ["ASU"],
-            "montevideo": ["MVD"],
-            "santiago": ["SCL"],
-            "san francisco": ["SFO"],
-            "san diego": ["SAN"],
-            "las vegas": ["LAS"],
-            "phoenix": ["PHX"],
-            "denver": ["DEN"],
-            "atlanta": ["ATL"],
-            "orlando": ["MCO"],
-            "tampa": ["TPA"],
-            "charlotte": ["CLT"],
-            "nashville": ["BNA"],
-            "new orleans": ["MSY"],
-            "dallas": ["DFW"],
-            "austin": ["AUS"],
-            "san antonio": ["SAT"],
-            "seattle": ["SEA"],
-            "portland": ["PDX"],
-            "salt lake city": ["SLC"],
-            "minneapolis": ["MSP"],
-            "detroit": ["DTW"],
-            "cleveland": ["CLE"],
-            "pittsburgh": ["PIT"],
-            "philadelphia": ["PHL"],
-            "boston": ["BOS"],
-            
-            # Oceania
-            "sydney": ["SYD"],
-            "melbourne": ["MEL"],
-            "brisbane": ["BNE"],
-            "perth": ["PER"],
-            "adelaide": ["ADL"],
-            "auckland": ["AKL"],
-            "wellington": ["WLG"],
-            "christchurch": ["CHC"],
-            "suva": ["SUV"],
-            "port moresby": ["POM"],
-        }
-        
-        # Combine all cities for easy lookup
-        self.all_cities = {**self.multi_airport_cities, **self.single_airport_cities}
+        # Static mappings are module-level constants shared by every instance
+        self.multi_airport_cities = _MULTI_AIRPORT_CITIES
+        self.single_airport_cities = _SINGLE_AIRPORT_CITIES
+        self.all_cities = _ALL_CITIES
     
     async def resolve_city_to_iata(self, city_name: str) -> List[str]:
         """
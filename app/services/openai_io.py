@@ -6,10 +6,11 @@ import asyncio
 import io
 from typing import List, Optional, Dict, Any, Tuple
 import httpx
+import orjson
 from openai import AsyncOpenAI
 from tenacity import retry, stop_after_attempt, wait_exponential, retry_if_exception_type
 
-from ..config import settings
+from ..config import get_settings
 from ..models.schemas import Message, MessageModality, QueryReformulatorInput, QueryReformulatorOutput
 from ..utils.errors import OpenAIError, RateLimitError
 from ..utils.logging import get_logger
@@ -17,11 +18,64 @@ from ..utils.logging import get_logger
 logger = get_logger(__name__)
 
 
+class BatchRequestBuilder:
+    """Collects chat completion requests into an OpenAI Batch API JSONL payload"""
+    
+    def __init__(self):
+        self.requests: List[Dict[str, Any]] = []
+    
+    def add_chat_completion(
+        self,
+        custom_id: str,
+        messages: List[Dict[str, str]],
+        model: str = "gpt-4o-mini",
+        temperature: float = 0.7,
+        max_tokens: Optional[int] = None
+    ) -> None:
+        """Queue a chat completion request under a caller-chosen id"""
+        
+        body: Dict[str, Any] = {
+            "model": model,
+            "messages": messages,
+            "temperature": temperature
+        }
+        if max_tokens:
+            body["max_tokens"] = max_tokens
+        
+        self.requests.append({
+            "custom_id": custom_id,
+            "method": "POST",
+            "url": "/v1/chat/completions",
+            "body": body
+        })
+    
+    def to_jsonl(self) -> bytes:
+        """Serialize queued requests as JSONL"""
+        return b"\n".join(orjson.dumps(request) for request in self.requests)
+    
+    def __len__(self) -> int:
+        return len(self.requests)
+
+
 class OpenAIService:
     """OpenAI service for chat, STT, and TTS operations"""
     
-    def __init__(self):
-        self.client = AsyncOpenAI(api_key=settings.openai_api_key)
+    def __init__(self, http_client: Optional[httpx.AsyncClient] = None):
+        # One AsyncOpenAI per service over a pooled keepalive transport: the shared client from
+        # main.lifespan, or an HTTP/2 pool of our own, so calls never pay a fresh TLS handshake
+        if http_client is None:
+            http_client = httpx.AsyncClient(
+                http2=True,
+                limits=httpx.Limits(max_connections=200, max_keepalive_connections=100)
+            )
+        self.client = AsyncOpenAI(
+            api_key=get_settings().openai_api_key,
+            http_client=http_client,
+            max_retries=2,
+            timeout=httpx.Timeout(60.0, connect=5.0)
+        )
+        # Built on first use; reused so its response caches persist across calls
+        self._reformulator = None
     
     @retry(
         stop=stop_after_attempt(3),
@@ -34,7 +88,8 @@ class OpenAIService:
         model: str = "gpt-4o",
         temperature: float = 0.7,
         max_tokens: Optional[int] = None,
-        response_format: Optional[Dict[str, Any]] = None
+        response_format: Optional[Dict[str, Any]] = None,
+        prompt_cache_key: Optional[str] = None
     ) -> str:
         """
         Generate chat completion using OpenAI
@@ -45,6 +100,7 @@ class OpenAIService:
             temperature: Sampling temperature
             max_tokens: Maximum tokens in response
             response_format: Response format specification
+            prompt_cache_key: Routes requests sharing a static prompt prefix to the same prompt cache
             
         Returns:
             Generated response text
@@ -65,6 +121,10 @@ class OpenAIService:
             if response_format:
                 kwargs["response_format"] = response_format
             
+            if prompt_cache_key:
+                # Not a named parameter in this SDK version; sent as a raw body field
+                kwargs["extra_body"] = {"prompt_cache_key": prompt_cache_key}
+            
             response = await self.client.chat.completions.create(**kwargs)
             
             content = response.choices[0].message.content
@@ -184,12 +244,42 @@ class OpenAIService:
             logger.error(error_msg)
             raise OpenAIError(error_msg)
     
-    async def detect_language(self, text: str) -> Optional[str]:
+    @retry(
+        stop=stop_after_attempt(3),
+        wait=wait_exponential(multiplier=1, min=4, max=10),
+        retry=retry_if_exception_type((httpx.RequestError, OpenAIError))
+    )
+    async def create_embedding(self, text: str, model: str = "text-embedding-3-small") -> List[float]:
+        """
+        Embed text with an OpenAI embedding model
+        
+        Args:
+            text: Text to embed
+            model: Embedding model to use
+            
+        Returns:
+            Embedding vector (unit length, so dot products are cosine similarities)
+        """
+        
+        try:
+            response = await self.client.embeddings.create(model=model, input=text)
+            return response.data[0].embedding
+            
+        except Exception as e:
+            if "rate_limit" in str(e).lower():
+                raise RateLimitError("OpenAI rate limit exceeded", service="openai")
+            
+            error_msg = f"OpenAI embedding failed: {str(e)}"
+            logger.error(error_msg)
+            raise OpenAIError(error_msg)
+    
+    async def detect_language(self, text: str, model: str = "gpt-4o-mini") -> Optional[str]:
         """
         Detect language of text using OpenAI
         
         Args:
             text: Text to analyze
+            model: OpenAI model to use; a small model is sufficient for this label
             
         Returns:
             Detected language code (e.g., 'en', 'ur', 'es') or None
@@ -199,20 +289,11 @@ class OpenAIService:
             return None
         
         try:
-            messages = [
-                {
-                    "role": "system",
-                    "content": "You are a language detection expert. Respond with only the ISO 639-1 language code (e.g., 'en' for English, 'ur' for Urdu, 'es' for Spanish) for the given text. If unsure, respond with 'en'."
-                },
-                {
-                    "role": "user",
-                    "content": f"Detect the language of this text: {text[:200]}"
-                }
-            ]
+            messages = self._language_detection_messages(text)
             
             response = await self.chat_completion(
                 messages=messages,
-                model="gpt-4o-mini",
+                model=model,
                 temperature=0.1,
                 max_tokens=10
             )
@@ -227,6 +308,135 @@ class OpenAIService:
             logger.warning(f"Language detection failed: {str(e)}, defaulting to 'en'")
             return "en"
     
+    def _language_detection_messages(self, text: str) -> List[Dict[str, str]]:
+        """Build the chat messages used for language detection"""
+        
+        return [
+            {
+                "role": "system",
+                "content": "You are a language detection expert. Respond with only the ISO 639-1 language code (e.g., 'en' for English, 'ur' for Urdu, 'es' for Spanish) for the given text. If unsure, respond with 'en'."
+            },
+            {
+                "role": "user",
+                "content": f"Detect the language of this text: {text[:200]}"
+            }
+        ]
+    
+    async def submit_batch(self, builder: BatchRequestBuilder, completion_window: str = "24h") -> str:
+        """
+        Submit queued chat completions to the OpenAI Batch API
+        
+        Intended for offline flows (backfills, re-scoring, evals); live chat
+        stays on chat_completion.
+        
+        Args:
+            builder: Builder holding the queued requests
+            completion_window: Batch completion window
+            
+        Returns:
+            Batch ID
+        """
+        
+        try:
+            logger.info(f"Submitting OpenAI batch with {len(builder)} requests")
+            
+            batch_file = io.BytesIO(builder.to_jsonl())
+            batch_file.name = "batch_requests.jsonl"
+            
+            uploaded = await self.client.files.create(file=batch_file, purpose="batch")
+            batch = await self.client.batches.create(
+                input_file_id=uploaded.id,
+                endpoint="/v1/chat/completions",
+                completion_window=completion_window
+            )
+            
+            logger.info(f"Submitted OpenAI batch: {batch.id}")
+            return batch.id
+            
+        except Exception as e:
+            error_msg = f"OpenAI batch submission failed: {str(e)}"
+            logger.error(error_msg)
+            raise OpenAIError(error_msg)
+    
+    async def wait_for_batch(self, batch_id: str, poll_interval: float = 30.0) -> Dict[str, Optional[str]]:
+        """
+        Poll a batch until it finishes and return its completions
+        
+        Args:
+            batch_id: Batch ID returned by submit_batch
+            poll_interval: Seconds between status checks
+            
+        Returns:
+            Dictionary mapping custom_id to completion text (None if the request failed)
+        """
+        
+        try:
+            while True:
+                batch = await self.client.batches.retrieve(batch_id)
+                if batch.status in ("completed", "failed", "expired", "cancelled"):
+                    break
+                await asyncio.sleep(poll_interval)
+            
+            if batch.status != "completed" or not batch.output_file_id:
+                raise OpenAIError(f"OpenAI batch {batch_id} finished with status {batch.status}")
+            
+            output = await self.client.files.content(batch.output_file_id)
+            
+            results: Dict[str, Optional[str]] = {}
+            for line in output.text.splitlines():
+                if not line.strip():
+                    continue
+                record = orjson.loads(line)
+                response = record.get("response") or {}
+                if response.get("status_code") == 200:
+                    results[record["custom_id"]] = response["body"]["choices"][0]["message"]["content"]
+                else:
+                    results[record["custom_id"]] = None
+            
+            logger.info(f"OpenAI batch {batch_id} completed: {len(results)} results")
+            return results
+            
+        except OpenAIError:
+            raise
+        except Exception as e:
+            error_msg = f"OpenAI batch retrieval failed: {str(e)}"
+            logger.error(error_msg)
+            raise OpenAIError(error_msg)
+    
+    async def detect_languages_batch(self, texts: Dict[str, str], poll_interval: float = 30.0) -> Dict[str, Optional[str]]:
+        """
+        Detect languages for many texts through the Batch API (offline use only)
+        
+        Args:
+            texts: Dictionary mapping caller ids (e.g. user_id) to text
+            poll_interval: Seconds between batch status checks
+            
+        Returns:
+            Dictionary mapping ids to detected language codes
+        """
+        
+        builder = BatchRequestBuilder()
+        for custom_id, text in texts.items():
+            if text.strip():
+                builder.add_chat_completion(
+                    custom_id,
+                    self._language_detection_messages(text),
+                    model="gpt-4o-mini",
+                    temperature=0.1,
+                    max_tokens=10
+                )
+        
+        if not len(builder):
+            return {custom_id: None for custom_id in texts}
+        
+        batch_id = await self.submit_batch(builder)
+        completions = await self.wait_for_batch(batch_id, poll_interval=poll_interval)
+        
+        return {
+            custom_id: (completions[custom_id].strip().lower()[:2] if completions.get(custom_id) else None)
+            for custom_id in texts
+        }
+    
     async def reformulate_query(self, input_data: QueryReformulatorInput) -> QueryReformulatorOutput:
         """
         Reformulate user query to extract clean travel intent
@@ -242,8 +452,9 @@ class OpenAIService:
         from ..nlp.reformulator import QueryReformulator
         
         try:
-            reformulator = QueryReformulator(self)
-            return await reformulator.reformulate_query(input_data)
+            if self._reformulator is None:
+                self._reformulator = QueryReformulator(self)
+            return await self._reformulator.reformulate_query(input_data)
             
         except Exception as e:
             logger.error(f"Query reformulation failed: {str(e)}")
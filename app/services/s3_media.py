@@ -2,13 +2,15 @@
 S3 service for media file upload and management
 """
 
+import time
 import uuid
+from collections import OrderedDict
 from datetime import datetime, timedelta
-from typing import Optional
+from typing import Optional, Tuple
 import boto3
 from botocore.exceptions import ClientError
 
-from ..config import settings
+from ..config import get_settings
 from ..utils.errors import S3Error
 from ..utils.logging import get_logger
 
@@ -19,6 +21,7 @@ class S3MediaService:
     """S3 service for uploading and managing media files"""
     
     def __init__(self):
+        settings = get_settings()
         self.s3_client = boto3.client(
             's3',
             region_name=settings.aws_region,
@@ -26,6 +29,38 @@ class S3MediaService:
             aws_secret_access_key=settings.aws_secret_access_key
         )
         self.bucket_name = settings.s3_bucket
+        
+        # Lifetime of presigned audio GET URLs
+        self.audio_url_expiry = 24 * 60 * 60
+        
+        # LRU of synthesized audio URLs keyed by user and content hash (each URL points under its
+        # user's key prefix); entries expire at half the presigned lifetime so a reused URL stays valid
+        self._audio_url_cache: "OrderedDict[str, Tuple[str, float]]" = OrderedDict()
+        self.audio_url_cache_size = 1024
+        self.audio_url_cache_ttl = self.audio_url_expiry // 2
+    
+    def get_cached_audio_url(self, cache_key: str) -> Optional[str]:
+        """Return a previously uploaded audio URL for this user/content key if still fresh"""
+        
+        entry = self._audio_url_cache.get(cache_key)
+        if entry is None:
+            return None
+        
+        url, stored_at = entry
+        if time.monotonic() - stored_at > self.audio_url_cache_ttl:
+            del self._audio_url_cache[cache_key]
+            return None
+        
+        self._audio_url_cache.move_to_end(cache_key)
+        return url
+    
+    def cache_audio_url(self, cache_key: str, url: str) -> None:
+        """Remember an uploaded audio URL for reuse by identical responses"""
+        
+        self._audio_url_cache[cache_key] = (url, time.monotonic())
+        self._audio_url_cache.move_to_end(cache_key)
+        while len(self._audio_url_cache) > self.audio_url_cache_size:
+            self._audio_url_cache.popitem(last=False)
     
     def _generate_audio_key(self, user_id: str, file_extension: str = "mp3") -> str:
         """Generate a unique S3 key for audio files"""
@@ -81,7 +116,7 @@ class S3MediaService:
             presigned_url = self.s3_client.generate_presigned_url(
                 'get_object',
                 Params={'Bucket': self.bucket_name, 'Key': s3_key},
-                ExpiresIn=24 * 60 * 60  # 24 hours
+                ExpiresIn=self.audio_url_expiry
             )
             
             logger.info(f"Successfully uploaded audio to S3 (presigned): {s3_key}")
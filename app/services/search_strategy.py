@@ -5,11 +5,12 @@ Search strategy service for bulk flight searches across dates and airports
 import asyncio
 from typing import List, Dict, Optional, Tuple
 from datetime import datetime, timedelta
-import itertools
+import numpy as np
 
 from ..models.schemas import Slots, Itinerary, TripType
 from ..services.travelport import TravelportService
 from ..services.date_parse import DateParsingService
+from ..agents.policies import SearchPolicies
 from ..utils.errors import TazaTicketError
 from ..utils.logging import get_logger
 
@@ -99,8 +100,8 @@ class SearchStrategy:
         async def search_date_combination(outbound_date: str, return_date: Optional[str]):
             async with semaphore:
                 try:
-                    # Create slots copy for this date combination
-                    search_slots = Slots(
+                    # Create slots copy for this date combination (fields already validated)
+                    search_slots = Slots.model_construct(
                         from_city=slots.from_city,
                         to_city=slots.to_city,
                         date=outbound_date,
@@ -259,21 +260,18 @@ class SearchStrategy:
             Combined list of itineraries from all airport combinations
         """
         
-        origin_codes = slots.from_iata_codes[:3]  # Limit to 3 origins to avoid explosion
-        destination_codes = slots.to_iata_codes[:3]  # Limit to 3 destinations
+        # Major origins first, at most 3 airports per side and capped per search type to avoid explosion
+        airport_combinations = list(SearchPolicies.iter_search_combinations(slots, max_per_side=3))
         
-        logger.info(f"Searching {len(origin_codes)} x {len(destination_codes)} airport combinations")
-        
-        # Generate all combinations
-        airport_combinations = list(itertools.product(origin_codes, destination_codes))
+        logger.info(f"Searching {len(airport_combinations)} airport combinations")
         
         semaphore = asyncio.Semaphore(self.max_concurrent_searches)
         
         async def search_airport_combination(from_iata: str, to_iata: str):
             async with semaphore:
                 try:
-                    # Create slots copy for this airport combination
-                    search_slots = Slots(
+                    # Create slots copy for this airport combination (fields already validated)
+                    search_slots = Slots.model_construct(
                         from_city=slots.from_city,
                         to_city=slots.to_city,
                         date=slots.date,
@@ -336,7 +334,7 @@ class SearchStrategy:
         logger.info(f"Searching with carrier filter: {carrier_code}")
         
         # Create slots copy with carrier preference
-        filtered_slots = Slots(
+        filtered_slots = Slots.model_construct(
             from_city=slots.from_city,
             to_city=slots.to_city,
             date=slots.date,
@@ -409,4 +407,29 @@ class SearchStrategy:
                     date_groups[search_date] = []
                 date_groups[search_date].append(itinerary)
         
-        return date_groups 
\ No newline at end of file
+        return date_groups
+    
+    def min_price_by_date(self, itineraries: List[Itinerary]) -> Dict[str, float]:
+        """
+        Get the cheapest total price for each travel date
+        
+        Args:
+            itineraries: List of itineraries tagged with search dates
+            
+        Returns:
+            Dictionary mapping dates to their minimum total price
+        """
+        
+        dated = [itinerary for itinerary in itineraries if getattr(itinerary, 'search_date', None)]
+        if not dated:
+            return {}
+        
+        # Aggregate in NumPy; month searches can produce hundreds of itineraries
+        prices = np.fromiter((itinerary.price.total for itinerary in dated), dtype=np.float64, count=len(dated))
+        dates = np.array([itinerary.search_date for itinerary in dated])
+        
+        unique_dates, inverse = np.unique(dates, return_inverse=True)
+        minima = np.full(len(unique_dates), np.inf)
+        np.minimum.at(minima, inverse, prices)
+        
+        return dict(zip(unique_dates.tolist(), minima.tolist()))
\ No newline at end of file
@@ -4,13 +4,13 @@ Travelport API service for authentication and flight search
 
 import asyncio
 import hashlib
-import json
 from typing import Dict, List, Optional, Tuple
 from datetime import datetime, timedelta
 import httpx
+import orjson
 from tenacity import retry, stop_after_attempt, wait_exponential, retry_if_exception_type
 
-from ..config import settings
+from ..config import get_settings
 from ..models.schemas import (
     TravelportResponse, 
     Slots, 
@@ -53,6 +53,7 @@ class TravelportService:
     async def _get_access_token(self) -> str:
         """Get OAuth access token from Travelport"""
         
+        settings = get_settings()
         data = {
             "grant_type": "password",
             "username": settings.travelport_username,
@@ -114,8 +115,9 @@ class TravelportService:
             "Content-Version": "11",
         }
         
-        if settings.travelport_access_group:
-            headers["XAUTH_TRAVELPORT_ACCESSGROUP"] = settings.travelport_access_group
+        access_group = get_settings().travelport_access_group
+        if access_group:
+            headers["XAUTH_TRAVELPORT_ACCESSGROUP"] = access_group
             
         return headers
     
@@ -178,7 +180,7 @@ class TravelportService:
             )
             
             response = await self.client.post(
-                settings.travelport_catalog_url,
+                get_settings().travelport_catalog_url,
                 headers=headers,
                 json=payload
             )
@@ -417,8 +419,8 @@ class TravelportService:
             "preferred_carrier": slots.preferred_carrier
         }
         
-        search_string = json.dumps(search_params, sort_keys=True)
-        return hashlib.md5(search_string.encode()).hexdigest()
+        # orjson emits compact sorted bytes directly, skipping the str -> bytes encode
+        return hashlib.md5(orjson.dumps(search_params, option=orjson.OPT_SORT_KEYS)).hexdigest()
     
     async def search_with_slots(self, slots: Slots) -> List[Itinerary]:
         """
@@ -3,12 +3,14 @@ Twilio client for WhatsApp messaging
 """
 
 import asyncio
-from typing import Optional
+from functools import cache, lru_cache
+from typing import Optional, Tuple
 import httpx
 from twilio.rest import Client
 from twilio.base.exceptions import TwilioException
+from twilio.request_validator import RequestValidator
 
-from ..config import settings
+from ..config import get_settings
 from ..models.schemas import MessageModality
 from ..utils.errors import TwilioError
 from ..utils.logging import get_logger
@@ -16,15 +18,30 @@ from ..utils.logging import get_logger
 logger = get_logger(__name__)
 
 
+@cache
+def _get_request_validator(auth_token: str) -> RequestValidator:
+    """Signature validator for an auth token, built once per process"""
+    return RequestValidator(auth_token)
+
+
+@lru_cache(maxsize=4096)
+def _signature_is_valid(auth_token: str, request_url: str, params: Tuple[Tuple[str, str], ...], signature: str) -> bool:
+    """Memoized HMAC check: Twilio's at-least-once retries resend identical URL, params and signature"""
+    return _get_request_validator(auth_token).validate(request_url, dict(params), signature)
+
+
 class TwilioClient:
     """Twilio client for sending WhatsApp messages"""
     
-    def __init__(self):
+    def __init__(self, http_client: Optional[httpx.AsyncClient] = None):
+        settings = get_settings()
         self.client = Client(
             settings.twilio_account_sid,
             settings.twilio_auth_token
         )
         self.from_number = settings.twilio_whatsapp_from
+        # Long-lived client for media downloads so connections to Twilio's media hosts are reused
+        self.http_client = http_client if http_client is not None else httpx.AsyncClient()
     
     async def send_text_message(
         self,
@@ -164,20 +181,20 @@ class TwilioClient:
         try:
             logger.info(f"Downloading media from Twilio: {media_url}")
             
-            # Use httpx for async HTTP request with redirect following
-            async with httpx.AsyncClient(follow_redirects=True) as client:
-                # Add Twilio authentication
-                auth = (settings.twilio_account_sid, settings.twilio_auth_token)
-                
-                response = await client.get(media_url, auth=auth)
-                response.raise_for_status()
-                
-                media_data = response.content
-                
-                logger.info(f"Successfully downloaded media: {len(media_data)} bytes")
-                
-                return media_data
-                
+            # Add Twilio authentication
+            settings = get_settings()
+            auth = (settings.twilio_account_sid, settings.twilio_auth_token)
+            
+            # Media URLs redirect to the storage host
+            response = await self.http_client.get(media_url, auth=auth, follow_redirects=True)
+            response.raise_for_status()
+            
+            media_data = response.content
+            
+            logger.info(f"Successfully downloaded media: {len(media_data)} bytes")
+            
+            return media_data
+            
         except httpx.HTTPStatusError as e:
             error_msg = f"HTTP error downloading media: {e.response.status_code} - {e.response.text}"
             logger.error(error_msg)
@@ -267,11 +284,13 @@ class TwilioClient:
         """
         
         try:
-            from twilio.request_validator import RequestValidator
-            
-            validator = RequestValidator(settings.twilio_auth_token)
-            
-            is_valid = validator.validate(request_url, post_vars, signature)
+            # The cache key is every signed input, so a hit is exactly the result a fresh check would give
+            is_valid = _signature_is_valid(
+                get_settings().twilio_auth_token,
+                request_url,
+                tuple(sorted(post_vars.items())),
+                signature
+            )
             
             if is_valid:
                 logger.info("Twilio webhook signature validation passed")
@@ -294,7 +313,7 @@ class TwilioClient:
         
         try:
             # Simple account fetch to test connectivity
-            account = self.client.api.accounts(settings.twilio_account_sid).fetch()
+            account = self.client.api.accounts(get_settings().twilio_account_sid).fetch()
             
             logger.info(f"Twilio health check passed: {account.friendly_name}")
             return True